@@ -22,3 +22,27 @@
 from ._impl import *
 from ._impl import __all__
 __all__ = __all__[:]
+
+from ._pool import *
+from ._pool import __all__ as _all
+__all__.extend(_all)
+
+from ._parallel import *
+from ._parallel import __all__ as _all
+__all__.extend(_all)
+
+from ._layout import *
+from ._layout import __all__ as _all
+__all__.extend(_all)
+
+from ._cache import *
+from ._cache import __all__ as _all
+__all__.extend(_all)
+
+from ._stats import *
+from ._stats import __all__ as _all
+__all__.extend(_all)
+
+from ._document import *
+from ._document import __all__ as _all
+__all__.extend(_all)
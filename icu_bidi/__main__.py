@@ -0,0 +1,90 @@
+#
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+"""Reorder the paragraphs of a text file
+
+Usage: python -m icu_bidi [options] INPUT OUTPUT
+
+See :func:`icu_bidi.bulk.reorder_mapped_file`.
+"""
+
+from __future__ import absolute_import, print_function, division
+
+import argparse
+
+from ._impl import UBiDiLevel, UBiDiReorderingMode, UBiDiReorderingOption, UBidiWriteReorderedOpt
+from .bulk import reorder_mapped_file
+
+LEVELS = {'ltr': UBiDiLevel.UBIDI_LTR,
+          'rtl': UBiDiLevel.UBIDI_RTL,
+          'default-ltr': UBiDiLevel.UBIDI_DEFAULT_LTR,
+          'default-rtl': UBiDiLevel.UBIDI_DEFAULT_RTL}
+
+
+def _choices(enum, prefix, exclude=()):
+    # map the lower case member names without prefix to the members
+    return dict((name[len(prefix):].lower(), member) for name, member in enum.__members__.items()
+                if name[len(prefix):].lower() not in exclude)
+
+
+MODES = _choices(UBiDiReorderingMode, 'UBIDI_REORDER_', ('count',))
+OPTIONS = _choices(UBiDiReorderingOption, 'UBIDI_OPTION_', ('default', 'streaming'))
+WRITE_OPTIONS = _choices(UBidiWriteReorderedOpt, 'UBIDI_')
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(prog='python -m icu_bidi',
+                                     description="Reorder the paragraphs of a text file from logical "
+                                     "to visual order using the Unicode Bidi algorithm.")
+    parser.add_argument('input', help="the input file")
+    parser.add_argument('output', help="the output file")
+    parser.add_argument('-e', '--encoding', default='utf-8',
+                        help="encoding of input and output, i.e. utf-8, utf-16-le or utf-16-be (default: %(default)s)")
+    parser.add_argument('-l', '--level', choices=sorted(LEVELS), default='default-ltr',
+                        help="paragraph level (default: %(default)s)")
+    parser.add_argument('-m', '--mode', choices=sorted(MODES), default='default',
+                        help="reordering mode (default: %(default)s)")
+    parser.add_argument('-o', '--option', choices=sorted(OPTIONS), action='append', default=[],
+                        help="reordering option, may be repeated")
+    parser.add_argument('-w', '--write-option', choices=sorted(WRITE_OPTIONS), action='append', default=[],
+                        help="option of ubidi_writeReordered, may be repeated")
+    parser.add_argument('-b', '--block-size', type=int, default=1 << 20,
+                        help="approximate size of the blocks in bytes (default: %(default)s)")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="number of worker processes (default: %(default)s)")
+    return parser
+
+
+def main(argv=None):
+    args = make_parser().parse_args(argv)
+    reordering_options = 0
+    for name in args.option:
+        reordering_options |= OPTIONS[name]
+    options = 0
+    for name in args.write_option:
+        options |= WRITE_OPTIONS[name]
+    reorder_mapped_file(args.input, args.output, processes=args.jobs, paraLevel=LEVELS[args.level],
+                        options=options, mode=MODES[args.mode], reordering_options=reordering_options,
+                        encoding=args.encoding, block_size=args.block_size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+from __future__ import absolute_import, print_function, division
+
+import collections
+import threading
+
+from ._impl import UBiDiLevel, UBiDiReorderingMode, UBiDiReorderingOption, unicode
+from ._pool import BidiPool
+
+__all__ = ['CachedBidi', 'CacheInfo']
+
+CacheInfo = collections.namedtuple('CacheInfo', 'hits misses evictions maxsize currsize')
+
+
+class CachedBidi(object):
+    """A thread-safe LRU cache of reordering results.
+
+    The cache holds up to *maxsize* results. The key of a result is the text,
+    the paragraph level, the write options, the reordering mode and the
+    reordering options. Texts longer than *max_text_len* are never cached.
+    Cache misses are computed with :class:`Bidi` objects from the
+    :class:`BidiPool` *pool*.
+    """
+
+    def __init__(self, maxsize=4096, max_text_len=256, pool=None):
+        self.maxsize = maxsize
+        self.max_text_len = max_text_len
+        self.pool = BidiPool() if pool is None else pool
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def reorder(self, text, paraLevel=UBiDiLevel.UBIDI_LTR, options=0,
+                mode=UBiDiReorderingMode.UBIDI_REORDER_DEFAULT,
+                reordering_options=UBiDiReorderingOption.UBIDI_OPTION_DEFAULT):
+        """Return the reordered text"""
+        return self.reorder_runs(text, paraLevel, options, mode, reordering_options)[0]
+
+    def reorder_runs(self, text, paraLevel=UBiDiLevel.UBIDI_LTR, options=0,
+                     mode=UBiDiReorderingMode.UBIDI_REORDER_DEFAULT,
+                     reordering_options=UBiDiReorderingOption.UBIDI_OPTION_DEFAULT):
+        """Return the tuple (reordered text, visual runs).
+
+        The runs are a :class:`BidiRuns` object shared by all callers. Do not
+        modify it.
+        """
+        if not isinstance(text, unicode):
+            text = unicode(text)
+        key = (text, int(paraLevel), int(options), int(mode), int(reordering_options))
+        cacheable = len(text) <= self.max_text_len
+        cache = self._cache
+        with self._lock:
+            if cacheable:
+                result = cache.pop(key, None)
+                if result is not None:
+                    cache[key] = result  # most recently used
+                    self.hits += 1
+                    return result
+            self.misses += 1
+        with self.pool.acquire(mode, reordering_options) as bidi:
+            bidi.set_para(text, paraLevel)
+            result = (bidi.get_reordered(options), bidi.get_visual_runs())
+        if cacheable:
+            with self._lock:
+                cache[key] = result
+                while len(cache) > self.maxsize:
+                    cache.popitem(last=False)
+                    self.evictions += 1
+        return result
+
+    def cache_info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._cache))
+
+    def cache_clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = self.evictions = 0
@@ -0,0 +1,307 @@
+#
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+
+from __future__ import absolute_import, print_function, division
+
+import array
+import bisect
+import re
+
+from ._impl import Bidi, BidiParagraph, BidiRuns, UBiDiLevel, UBIDI_MAP_NOWHERE, INT32_TYPECODE, unicode
+
+__all__ = ['BidiDocument']
+
+# Paragraph separators (bidi class B). ICU treats CR LF as a single separator.
+_PARA_SEP = re.compile(u'\r\n|[\n\r\x1c-\x1e\x85\u2029]')
+
+
+def _utf16_length(text):
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _split_paragraphs(text):
+    # the paragraphs including their separators; the last one has no separator
+    pieces = []
+    start = 0
+    for match in _PARA_SEP.finditer(text):
+        pieces.append(text[start:match.end()])
+        start = match.end()
+    pieces.append(text[start:])
+    return pieces
+
+
+def _shifted(index_map, offset):
+    # add offset to the indexes of index_map except UBIDI_MAP_NOWHERE
+    if UBIDI_MAP_NOWHERE in index_map:
+        return (i if i == UBIDI_MAP_NOWHERE else i + offset for i in index_map)
+    return map(offset.__add__, index_map)
+
+
+class _Paragraph(object):
+    # the cached bidi information of a paragraph, indexes relative to the paragraph
+    __slots__ = ('text', 'length', 'level', 'reordered', 'levels', 'logical_map', 'visual_map', 'runs')
+
+    def __init__(self, text, bidi, paraLevel, options):
+        self.text = text
+        self.length = length = _utf16_length(text)
+        if length:
+            bidi.set_para(text, paraLevel)
+            self.level = bidi.para_level
+            self.reordered = bidi.get_reordered(options)
+            self.levels = bytes(bidi.get_levels())
+            self.logical_map = bidi.get_logical_map()
+            self.visual_map = bidi.get_visual_map()
+            self.runs = bidi.get_visual_runs()
+        else:
+            self.level = int(paraLevel) if paraLevel < UBiDiLevel.UBIDI_DEFAULT_LTR else paraLevel & 1
+            self.reordered = u''
+            self.levels = b''
+            self.logical_map = self.visual_map = array.array(INT32_TYPECODE)
+            self.runs = BidiRuns(array.array('b'), array.array(INT32_TYPECODE), array.array(INT32_TYPECODE))
+
+    def index(self, offset):
+        # convert the UTF-16 offset into an index of self.text
+        if self.length == len(self.text):
+            return offset
+        return len(self.text.encode('utf-16-le')[:2 * offset].decode('utf-16-le'))
+
+
+class BidiDocument(object):
+    """A text with bidi information, that is updated incrementally.
+
+    The document splits the text into paragraphs and analyses each paragraph
+    separately with the :class:`Bidi` object *bidi* (default: a new one).
+    The paragraph level *paraLevel*, the write *options* and the reordering
+    settings of *bidi* apply to all paragraphs. Paragraphs are kept in
+    logical order.
+
+    The document keeps the results of each paragraph together with the
+    logical, visual and run start offsets of the paragraph. :meth:`edit`
+    replaces a part of the text. It runs the Bidi algorithm only for the
+    edited paragraphs and shifts the offsets of the following paragraphs.
+    Methods for a single index find the paragraph by bisection. Methods for
+    a range of paragraphs compose the results of these paragraphs only.
+
+    All indexes are UTF-16 indexes. Unlike the runs of a :class:`Bidi`
+    object the runs of a document never cross a paragraph boundary.
+    """
+
+    def __init__(self, text=u'', paraLevel=UBiDiLevel.UBIDI_LTR, options=0, bidi=None):
+        if not isinstance(text, unicode):
+            text = unicode(text)
+        if bidi is None:
+            bidi = Bidi()
+            bidi.order_paragraphs_ltr = True
+        self.bidi = bidi
+        self.paraLevel = paraLevel
+        self.options = int(options)
+        self._paragraphs = []
+        # The start offsets of the paragraphs: UTF-16 index, visual index,
+        # run index and index into the text
+        self._starts = []
+        self._visual_starts = []
+        self._run_starts = []
+        self._text_starts = []
+        self._replace(0, 0, [self._analyse(piece) for piece in _split_paragraphs(text)])
+        self._text = text
+
+    def _analyse(self, text):
+        return _Paragraph(text, self.bidi, self.paraLevel, self.options)
+
+    def _replace(self, first, last, new_paragraphs):
+        # replace the paragraphs first to last (exclusive) and update the offsets
+        paragraphs = self._paragraphs
+        if first:
+            previous = paragraphs[first - 1]
+            ends = [self._starts[first - 1] + previous.length,
+                    self._visual_starts[first - 1] + len(previous.visual_map),
+                    self._run_starts[first - 1] + len(previous.runs),
+                    self._text_starts[first - 1] + len(previous.text)]
+        else:
+            ends = [0, 0, 0, 0]
+        new_offsets = ([], [], [], [])
+        for paragraph in new_paragraphs:
+            for offsets, end in zip(new_offsets, ends):
+                offsets.append(end)
+            ends[0] += paragraph.length
+            ends[1] += len(paragraph.visual_map)
+            ends[2] += len(paragraph.runs)
+            ends[3] += len(paragraph.text)
+        for offsets, new, end in zip((self._starts, self._visual_starts, self._run_starts, self._text_starts),
+                                     new_offsets, ends):
+            if last < len(paragraphs):
+                # shift the offsets of the following paragraphs
+                delta = end - offsets[last]
+                new.extend(offset + delta for offset in offsets[last:])
+            offsets[first:] = new
+        paragraphs[first:last] = new_paragraphs
+        last_paragraph = paragraphs[-1]
+        self.length = self._starts[-1] + last_paragraph.length
+        self.visual_length = self._visual_starts[-1] + len(last_paragraph.visual_map)
+        self._text = None
+
+    def _find(self, offset):
+        # return the index of the paragraph containing the UTF-16 index *offset*
+        if not 0 <= offset <= self.length:
+            raise IndexError("index out of range")
+        return bisect.bisect_right(self._starts, offset) - 1
+
+    @property
+    def text(self):
+        text = self._text
+        if text is None:
+            text = self._text = u''.join(p.text for p in self._paragraphs)
+        return text
+
+    def get_text(self, start=0, limit=None):
+        """Return the text from the UTF-16 index *start* to *limit*."""
+        if limit is None:
+            limit = self.length
+        if start >= limit:
+            return u''
+        first = self._find(start)
+        last = self._find(limit)
+        paragraphs = self._paragraphs
+        text_start = self._text_starts[first]
+        start = text_start + paragraphs[first].index(start - self._starts[first])
+        limit = self._text_starts[last] + paragraphs[last].index(limit - self._starts[last])
+        if self._text is not None:
+            return self._text[start:limit]
+        return u''.join(p.text for p in paragraphs[first:last + 1])[start - text_start:limit - text_start]
+
+    def count_paragraphs(self):
+        return len(self._paragraphs)
+
+    def get_paragraph(self, charIndex):
+        """Return the :class:`BidiParagraph` containing the UTF-16 index *charIndex*."""
+        return self.get_paragraph_by_index(self._find(charIndex))
+
+    def get_paragraph_by_index(self, paraIndex):
+        paragraph = self._paragraphs[paraIndex]
+        start = self._starts[paraIndex]
+        return BidiParagraph(paraIndex, start, start + paragraph.length, paragraph.level)
+
+    def iter_paragraphs(self, first=0, last=None):
+        """Yield a :class:`BidiParagraph` for each paragraph of the document."""
+        if last is None:
+            last = len(self._paragraphs)
+        for index in range(first, last):
+            yield self.get_paragraph_by_index(index)
+
+    def get_reordered(self, first=0, last=None):
+        """Return the reordered text of the paragraphs *first* to *last* (exclusive).
+
+        The paragraphs are reordered with the write options of the document.
+        """
+        return u''.join(p.reordered for p in self._paragraphs[first:last])
+
+    def get_levels(self, first=0, last=None):
+        """Get the embedding level of each UTF-16 code unit of the paragraphs *first* to *last* as bytes."""
+        return b''.join(p.levels for p in self._paragraphs[first:last])
+
+    def get_logical_map(self, first=0, last=None):
+        """Get the logical-to-visual index map of the paragraphs *first* to *last* as an array of int32.
+
+        The visual indexes are document wide indexes.
+        """
+        index_map = array.array(INT32_TYPECODE)
+        for paragraph, visual_start in zip(self._paragraphs[first:last], self._visual_starts[first:last]):
+            index_map.extend(_shifted(paragraph.logical_map, visual_start))
+        return index_map
+
+    def get_visual_map(self, first=0, last=None):
+        """Get the visual-to-logical index map of the paragraphs *first* to *last* as an array of int32.
+
+        The logical indexes are document wide indexes.
+        """
+        index_map = array.array(INT32_TYPECODE)
+        for paragraph, start in zip(self._paragraphs[first:last], self._starts[first:last]):
+            index_map.extend(_shifted(paragraph.visual_map, start))
+        return index_map
+
+    def get_visual_runs(self, first=0, last=None):
+        """Get the runs of the paragraphs *first* to *last* in visual order as a :class:`BidiRuns` object."""
+        runs = BidiRuns(array.array('b'), array.array(INT32_TYPECODE), array.array(INT32_TYPECODE))
+        for paragraph, start in zip(self._paragraphs[first:last], self._starts[first:last]):
+            runs.directions.extend(paragraph.runs.directions)
+            runs.starts.extend(map(start.__add__, paragraph.runs.starts))
+            runs.lengths.extend(paragraph.runs.lengths)
+        return runs
+
+    def get_visual_index(self, logicalIndex):
+        if not 0 <= logicalIndex < self.length:
+            raise IndexError("index out of range")
+        index = self._find(logicalIndex)
+        visual_index = self._paragraphs[index].logical_map[logicalIndex - self._starts[index]]
+        if visual_index == UBIDI_MAP_NOWHERE:
+            return visual_index
+        return visual_index + self._visual_starts[index]
+
+    def get_logical_index(self, visualIndex):
+        if not 0 <= visualIndex < self.visual_length:
+            raise IndexError("index out of range")
+        index = bisect.bisect_right(self._visual_starts, visualIndex) - 1
+        logical_index = self._paragraphs[index].visual_map[visualIndex - self._visual_starts[index]]
+        if logical_index == UBIDI_MAP_NOWHERE:
+            return logical_index
+        return logical_index + self._starts[index]
+
+    def count_runs(self):
+        return self._run_starts[-1] + len(self._paragraphs[-1].runs)
+
+    def get_visual_run(self, runIndex):
+        """Return the tuple ``(direction, start, length)`` of the run *runIndex*."""
+        if not 0 <= runIndex < self.count_runs():
+            raise IndexError("index out of range")
+        index = bisect.bisect_right(self._run_starts, runIndex) - 1
+        runs = self._paragraphs[index].runs
+        i = runIndex - self._run_starts[index]
+        return runs.directions[i], runs.starts[i] + self._starts[index], runs.lengths[i]
+
+    def edit(self, start, limit, text):
+        """Replace the text from the UTF-16 index *start* to *limit* with *text*.
+
+        Returns the tuple ``(first, last)`` of the indexes of the first and
+        the last + 1 paragraphs, that have been analysed again.
+        """
+        if not isinstance(text, unicode):
+            text = unicode(text)
+        if start > limit:
+            raise ValueError("start > limit")
+        paragraphs = self._paragraphs
+        first = self._find(start)
+        last = self._find(limit)
+        head = paragraphs[first]
+        tail = paragraphs[last]
+        new_text = (head.text[:head.index(start - self._starts[first])] + text +
+                    tail.text[tail.index(limit - self._starts[last]):])
+        if first > 0 and new_text.startswith(u'\n') and paragraphs[first - 1].text.endswith(u'\r'):
+            # the LF joins the CR of the previous paragraph
+            first -= 1
+            new_text = paragraphs[first].text + new_text
+        pieces = _split_paragraphs(new_text)
+        if last < len(paragraphs) - 1:
+            # the text ends with the separator of the paragraph *last*
+            pieces.pop()
+        new_paragraphs = [self._analyse(piece) for piece in pieces]
+        self._replace(first, last + 1, new_paragraphs)
+        return first, first + len(new_paragraphs)
@@ -21,15 +21,23 @@
 
 from __future__ import absolute_import, print_function, division
 
-import ctypes.util
+import array
+import collections
+import ctypes
+import os
+import re
+import sys
 import threading
 import weakref
 import warnings
+import zlib
 
 from enum import IntEnum
 import icu
 
-__all__ = ['Bidi', 'UBiDiReorderingMode', 'UBiDiReorderingOption', 'UBiDiDirection', 'UBidiWriteReorderedOpt', 'UBiDiLevel']
+__all__ = ['Bidi', 'UBiDiReorderingMode', 'UBiDiReorderingOption', 'UBiDiDirection', 'UBidiWriteReorderedOpt', 'UBiDiLevel',
+           'UBIDI_MAP_NOWHERE', 'invert_map', 'BidiRuns', 'BidiLine', 'BidiParagraph',
+           'base_direction', 'base_directions', 'IcuMemoryError']
 
 try:
     unicode  # @UndefinedVariable
@@ -37,6 +45,38 @@ except NameError:
     unicode = str
 
 
+class LazyFunction(object):
+    """A placeholder for an ICU function, that binds the function on its first call.
+
+    The first call creates the ctypes function and replaces the placeholder
+    in the namespace of the :class:`IcuBindingGenerator`. Afterwards the
+    ctypes function gets called directly.
+    """
+
+    def __init__(self, generator, name, restype, errcheck, argtypes):
+        self.generator = generator
+        self.name = name
+        self.restype = restype
+        self.errcheck = errcheck
+        self.argtypes = argtypes
+        self.func = None
+
+    def bind(self):
+        """Return the ctypes function."""
+        func = self.func
+        if func is None:
+            func = self.func = self.generator.bind(self)
+        return func
+
+    def __call__(self, *args):
+        func = self.bind()
+        self.generator.replace(self, func)
+        return func(*args)
+
+    def __repr__(self):
+        return "<{} {}>".format(type(self).__name__, self.name)
+
+
 class IcuBindingGenerator(object):
     TESTED_VERSIONS = ('48', '53', '57')
     NAME = 'icuuc'
@@ -46,26 +86,93 @@ class IcuBindingGenerator(object):
     INOUT = 3
     ZERO = 4
 
-    def __init__(self, version):
+    LIBRARY_ENV = 'ICU_BIDI_LIBRARY'
+    """The name of the environment variable, that overrides the path of the library"""
+
+    def __init__(self, version, namespace=None):
         if version[1:2] == '.':
             # old style versin number
             version = version[0] + version[2:]
         version = version.split('.')[0]
-        libname = self.NAME
-        try:
-            lib = getattr(ctypes.cdll, libname + version)
-        except (AttributeError, EnvironmentError):
-            libname = ctypes.util.find_library(libname)
-            if libname is None:
-                raise
-            lib = getattr(ctypes.cdll, libname)
-        if version not in self.TESTED_VERSIONS:
-            warnings.warn("Version {} of library {} is untested.".format(version, lib._name),
-                          stacklevel=2)
-        self.lib = lib
         self.version = version
+        # the dictionary, where LazyFunction objects get replaced, usually globals()
+        self.namespace = namespace
+        self._lib = None
+        # all functions created by this generator
+        self.functions = []
+
+    @property
+    def lib(self):
+        """The library, loaded on first access"""
+        lib = self._lib
+        if lib is None:
+            lib = self._lib = self.load_library()
+            if self.version not in self.TESTED_VERSIONS:
+                warnings.warn("Version {} of library {} is untested.".format(self.version, lib._name),
+                              stacklevel=2)
+        return lib
+
+    def cache_file(self):
+        """Return the path of the file, that caches the path of the library.
+
+        The name of the file depends on the Python installation (sys.prefix)
+        and the location of PyICU, because different virtual environments
+        may use different builds of the library.
+        """
+        cache_dir = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        key = u"{}\0{}".format(sys.prefix, getattr(icu, '__file__', '')).encode('utf-8')
+        return os.path.join(cache_dir, 'icu_bidi', 'library-{}{}-{:08x}'.format(
+            self.NAME, self.version, zlib.crc32(key) & 0xffffffff))
+
+    def load_library(self):
+        """Load the library.
+
+        The path of the library is taken from the environment variable
+        :attr:`LIBRARY_ENV`, from the cache file or from a search. Because
+        :func:`ctypes.util.find_library` may run external programs, the
+        result of the search is written to the cache file.
+        """
+        path = os.environ.get(self.LIBRARY_ENV)
+        if path:
+            return ctypes.CDLL(path)
+        cache_file = self.cache_file()
+        try:
+            with open(cache_file) as f:
+                return ctypes.CDLL(f.read().strip())
+        except EnvironmentError:
+            pass
+        lib = self.find_library()
+        try:
+            cache_dir = os.path.dirname(cache_file)
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+            tmp_file = "{}.{}".format(cache_file, os.getpid())
+            with open(tmp_file, 'w') as f:
+                f.write(lib._name)
+            os.rename(tmp_file, cache_file)
+        except EnvironmentError:
+            pass
+        return lib
+
+    def find_library(self):
+        libname = self.NAME
+        version = self.version
+        # usual names on Windows, Linux and macOS
+        for name in (libname + version, "lib{}.so.{}".format(libname, version),
+                     "lib{}.{}.dylib".format(libname, version)):
+            try:
+                return ctypes.CDLL(name)
+            except EnvironmentError:
+                pass
+        # ctypes.util imports many modules
+        from ctypes.util import find_library
+        name = find_library(libname)
+        if name is None:
+            raise EnvironmentError("Can't find the library {} version {}".format(libname, version))
+        return ctypes.CDLL(name)
 
     def function(self, name, restype=None, errcheck=None, *argspecs):
+        """Return a :class:`LazyFunction` for the ICU function *name*."""
         if isinstance(errcheck, tuple):
             argspecs = (errcheck,) + argspecs
             errcheck = None
@@ -75,13 +182,38 @@ class IcuBindingGenerator(object):
         # paramflags = tuple(s[1:] for s in argspecs)
         # prototype = ctypes.CFUNCTYPE(restype, *argtypes)
         # func = prototype((name + "_" + self.version, self.lib), paramflags)
-        func = getattr(self.lib, name + "_" + self.version)
-        func.argtypes = argtypes
-        func.restype = restype
-        if errcheck is not None:
-            func.errcheck = errcheck
+        func = LazyFunction(self, name, restype, errcheck, argtypes)
+        self.functions.append(func)
+        return func
+
+    def unchecked(self, func):
+        """Return a new function for *func* without errcheck.
+
+        *func* is a function returned by :meth:`function`. The caller passes
+        a pointer to its own UErrorCode and checks it.
+        """
+        unchecked = LazyFunction(self, func.name, func.restype, None, func.argtypes)
+        self.functions.append(unchecked)
+        return unchecked
+
+    def bind(self, lazy):
+        """Create the ctypes function for the :class:`LazyFunction` *lazy*."""
+        func = self.lib[lazy.name + "_" + self.version]
+        func.argtypes = lazy.argtypes
+        func.restype = lazy.restype
+        if lazy.errcheck is not None:
+            func.errcheck = lazy.errcheck
+        self.functions.append(func)
         return func
 
+    def replace(self, lazy, func):
+        """Replace *lazy* by *func* in the namespace."""
+        namespace = self.namespace
+        if namespace is not None:
+            for key, value in list(namespace.items()):
+                if value is lazy:
+                    namespace[key] = func
+
 
 class ctypes_UBiDi(ctypes.Structure):
     pass
@@ -95,10 +227,49 @@ ctypes_UErrorCode = ctypes.c_int
 ctypes_P_UErrorCode = ctypes.POINTER(ctypes_UErrorCode)
 ctypes_P_c_int32 = ctypes.POINTER(ctypes.c_int32)
 
+# array type code for int32_t
+INT32_TYPECODE = 'i' if array.array('i').itemsize == 4 else 'l'
+
+
+def int32_array(size):
+    return array.array(INT32_TYPECODE, [0]) * size
+
+
+def int32_array_pointer(arr):
+    return ctypes.cast(arr.buffer_info()[0], ctypes_P_c_int32)
+
+
+# Python 2: memoryviews can't be released
+_RELEASABLE_VIEWS = hasattr(memoryview, 'release')
+
+if hasattr(memoryview, 'cast'):
+    def _byte_view(obj):
+        return memoryview(obj).cast('B')
+
+    def _view_info(view):
+        # the size in bytes and if the memory is writable and C-contiguous
+        return view.nbytes, not view.readonly and view.c_contiguous
+else:
+    # Python 2: memoryview has no cast(), nbytes and c_contiguous
+    def _byte_view(obj):
+        return memoryview(obj)
+
+    def _view_info(view):
+        nbytes = view.itemsize
+        contiguous = True
+        for dim, stride in reversed(list(zip(view.shape or (), view.strides or ()))):
+            if dim > 1 and stride != nbytes:
+                contiguous = False
+            nbytes *= dim
+        return nbytes, not view.readonly and contiguous
+
 # Make sure the icu library uses UTF-16 internally
 assert (lambda s=icu.UnicodeString(u"\U00010000"): s.length() == 2 and
         s.charAt(0) == 0xd800 and s.charAt(1) == 0xdc00)()
 
+# the name of the UTF-16 encoding in native byte order, known to Python and ICU
+UCHAR_ENCODING = "UTF-16BE" if sys.byteorder == "big" else "UTF-16LE"
+
 if ctypes.sizeof(ctypes.c_wchar) == 2:
     # avoids a copy
     ctypes_P_UChar = ctypes.c_wchar_p  # at least for windows
@@ -111,9 +282,31 @@ if ctypes.sizeof(ctypes.c_wchar) == 2:
         buf = ctypes.create_unicode_buffer(size)
         return buf
 
+    def ucharbuf_alloc(size):
+        # returns the buffer and a view of the buffer
+        buf = ctypes.create_unicode_buffer(size)
+        return buf, buf
+
+    def uchars_from_text(utext):
+        return utext, len(utext)
+
+    def ucharbuf_copy(buf, uchars, length):
+        buf[:length] = uchars
+
+    def text_from_ucharview(view, limit, start=0):
+        return view[start:limit]
+
     def text_from_ucharbuf(buf, length):
         return buf[:length]
 
+    def ucharbuf_from_address(address, length):
+        # returns a buffer and a view of the memory at address
+        view = (ctypes.c_wchar * length).from_address(address)
+        return ctypes.cast(address, ctypes_P_UChar), view
+
+    def bytes_from_ucharview(view, limit, start=0):
+        return ctypes.string_at(ctypes.addressof(view) + 2 * start, 2 * (limit - start))
+
 else:
     import codecs
     uchar_codec = codecs.lookup("UTF-16BE" if codecs.BOM == codecs.BOM_BE else "UTF-16LE")
@@ -132,10 +325,108 @@ else:
         buf = ctypes.create_string_buffer(size * 2)
         return ctypes_P_UChar(buf)
 
+    def ucharbuf_alloc(size):
+        # returns the buffer and a view of the buffer
+        buf = ctypes.create_string_buffer(size * 2)
+        return ctypes_P_UChar(buf), memoryview(buf)
+
+    def uchars_from_text(utext):
+        encoded = uchar_codec.encode(utext)[0]
+        return encoded, len(encoded) // 2
+
+    def ucharbuf_copy(buf, uchars, length):
+        ctypes.memmove(buf, uchars, 2 * length)
+
+    def text_from_ucharview(view, limit, start=0):
+        # decoding from the memoryview avoids a copy of the buffer content
+        return uchar_codec.decode(view[2 * start:2 * limit])[0]
+
     def text_from_ucharbuf(buf, length):
         p_charbuf = ctypes.cast(buf, ctypes.POINTER(ctypes.c_char * (2 * length)))
         return uchar_codec.decode(p_charbuf.contents.raw)[0]
 
+    def ucharbuf_from_address(address, length):
+        # returns a buffer and a view of the memory at address
+        view = memoryview((ctypes.c_char * (2 * length)).from_address(address))
+        return ctypes.cast(address, ctypes_P_UChar), view
+
+    def bytes_from_ucharview(view, limit, start=0):
+        return view[2 * start:2 * limit].tobytes()
+
+
+class UCharBuffer(object):
+    """A grow-only UTF-16 buffer.
+
+    The buffer can be reused for many texts. It gets reallocated only, if
+    a text does not fit into the current buffer.
+    """
+
+    def __init__(self, capacity=0):
+        self.buf = self.view = None
+        self.capacity = -1
+        self.reserve(capacity)
+
+    def reserve(self, capacity):
+        """Make sure, the buffer can hold at least *capacity* UChars."""
+        if capacity > self.capacity:
+            self.buf, self.view = ucharbuf_alloc(capacity)
+            self.capacity = capacity
+        return self.buf
+
+    def store(self, utext):
+        """Copy *utext* into the buffer and return its length in UChars."""
+        uchars, length = uchars_from_text(utext)
+        ucharbuf_copy(self.reserve(length), uchars, length)
+        return length
+
+    def get_text(self, limit, start=0):
+        """Return the UChars from *start* to *limit* as text."""
+        return text_from_ucharview(self.view, limit, start)
+
+    def get_bytes(self, limit, start=0):
+        """Return the UChars from *start* to *limit* as UTF-16 bytes in native byte order."""
+        return bytes_from_ucharview(self.view, limit, start)
+
+
+class UCharMemory(object):
+    """UTF-16 text in the memory of another object.
+
+    *owner* is the object, that provides the memory at *address*. It is kept
+    alive as long as this object exists.
+    """
+
+    def __init__(self, owner, address, length):
+        self.owner = owner
+        self.buf, self.view = ucharbuf_from_address(address, length)
+        self.length = length
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """Return an :class:`UCharMemory` for an object supporting the buffer protocol.
+
+        The memory of bytes objects and writable C-contiguous buffers is used
+        without copying. Other buffers get copied.
+        """
+        view = memoryview(buffer)
+        nbytes, writable = _view_info(view)
+        if nbytes % 2:
+            raise ValueError("UTF-16 text requires an even number of bytes, got {}".format(nbytes))
+        if not isinstance(buffer, bytes) and writable:
+            owner = (ctypes.c_char * nbytes).from_buffer(buffer)
+            return cls(owner, ctypes.addressof(owner), nbytes // 2)
+        if not isinstance(buffer, bytes):
+            buffer = view.tobytes()
+        address = ctypes.cast(ctypes.c_char_p(buffer), ctypes.c_void_p).value
+        return cls(buffer, address, nbytes // 2)
+
+    def get_text(self, limit, start=0):
+        """Return the UChars from *start* to *limit* as text."""
+        return text_from_ucharview(self.view, limit, start)
+
+    def get_bytes(self, limit, start=0):
+        """Return the UChars from *start* to *limit* as UTF-16 bytes in native byte order."""
+        return bytes_from_ucharview(self.view, limit, start)
+
 
 class IcuErrChecker(object):
     DEFAULT_CHECKER = None  # to be overridden later
@@ -162,12 +453,20 @@ class IcuErrChecker(object):
             if not isinstance(arg, cls):
                 continue
             if arg.is_failure():
-                v = arg.value
-                raise icu.ICUError(v, icu.ICUError.messages.get(v, "Unknown error code " + str(v)))
+                raise cls.exception(arg.value)
             return arguments
         return arguments
 
+    @classmethod
+    def exception(cls, error_code):
+        """Return the exception for a failure *error_code*"""
+        message = icu.ICUError.messages.get(error_code, "Unknown error code " + str(error_code))
+        if error_code == cls.U_MEMORY_ALLOCATION_ERROR:
+            return IcuMemoryError(error_code, message)
+        return icu.ICUError(error_code, message)
+
     U_ZERO_ERROR = 0
+    U_MEMORY_ALLOCATION_ERROR = 7
 
     def is_failure(self):
         return self.value > self.U_ZERO_ERROR
@@ -176,6 +475,10 @@ class IcuErrChecker(object):
         return self.value <= self.U_ZERO_ERROR
 
 
+class IcuMemoryError(icu.ICUError, MemoryError):
+    """ICU failed to allocate memory (U_MEMORY_ALLOCATION_ERROR)"""
+
+
 class _DefaultIcuErrChecker(IcuErrChecker):
     repository = threading.local()
 
@@ -192,6 +495,14 @@ class _DefaultIcuErrChecker(IcuErrChecker):
 IcuErrChecker.DEFAULT_CHECKER = _DefaultIcuErrChecker()
 
 
+UBIDI_MAP_NOWHERE = -1
+"""Special value which can be returned by the mapping functions when a logical index has no corresponding visual index or vice-versa.
+
+This may happen for the logical-to-visual mapping of a Bidi control when option UBIDI_OPTION_REMOVE_CONTROLS is specified.
+This can also happen for the visual-to-logical mapping of a Bidi mark (LRM or RLM) inserted by option UBIDI_OPTION_INSERT_MARKS.
+"""
+
+
 class UBiDiLevel(IntEnum):
     UBIDI_LTR = 0
     """Paragraph level setting: LRT text
@@ -259,6 +570,12 @@ class UBiDiLevel(IntEnum):
     (The maximum resolved level can be up to UBIDI_MAX_EXPLICIT_LEVEL+1).
     """
 
+    UBIDI_LEVEL_OVERRIDE = 0x80
+    """Bit flag for level input.
+
+    Overrides directional properties.
+    """
+
 
 class UBiDiReorderingMode(IntEnum):
     UBIDI_REORDER_DEFAULT = 0
@@ -473,12 +790,16 @@ class UBidiWriteReorderedOpt(IntEnum):
     """
 
 
-_bg = IcuBindingGenerator(icu.ICU_VERSION)
+_bg = IcuBindingGenerator(icu.ICU_VERSION, globals())
 
 _pBiDi = (ctypes_P_UBiDi, _bg.IN, 'pBiDi')
 _pErrorCode = (ctypes_P_UErrorCode, _bg.OUT, 'pErrorCode', IcuErrChecker.DEFAULT_CHECKER)
 
 ubidi_open = _bg.function('ubidi_open', ctypes_P_UBiDi)
+ubidi_openSized = _bg.function('ubidi_openSized', ctypes_P_UBiDi, IcuErrChecker.errcheck,
+                               (ctypes.c_int32, _bg.IN, 'maxLength'),
+                               (ctypes.c_int32, _bg.IN, 'maxRunCount'),
+                               _pErrorCode)
 ubidi_close = _bg.function('ubidi_close', None, _pBiDi)
 ubidi_setInverse = _bg.function('ubidi_setInverse', None, _pBiDi, (ctypes_UBool, _bg.IN, 'isInverse'))
 ubidi_isInverse = _bg.function('ubidi_isInverse', ctypes_UBool, _pBiDi)
@@ -493,6 +814,35 @@ ubidi_setPara = _bg.function('ubidi_setPara', None, IcuErrChecker.errcheck,
                              (ctypes_UBiDiLevel, _bg.IN, 'paraLevel', UBiDiLevel.UBIDI_LTR),
                              (ctypes_P_UBiDiLevel, _bg.IN, 'embeddingLevels', ctypes_P_UBiDiLevel()),
                              _pErrorCode)
+ubidi_orderParagraphsLTR = _bg.function('ubidi_orderParagraphsLTR', None, _pBiDi, (ctypes_UBool, _bg.IN, 'orderParagraphsLTR'))
+ubidi_isOrderParagraphsLTR = _bg.function('ubidi_isOrderParagraphsLTR', ctypes_UBool, _pBiDi)
+ubidi_setLine = _bg.function('ubidi_setLine', None, IcuErrChecker.errcheck,
+                             _pBiDi,
+                             (ctypes.c_int32, _bg.IN, 'start'),
+                             (ctypes.c_int32, _bg.IN, 'limit'),
+                             (ctypes_P_UBiDi, _bg.INOUT, 'pLineBiDi'),
+                             _pErrorCode)
+ubidi_getDirection = _bg.function('ubidi_getDirection', ctypes.c_int, _pBiDi)
+ubidi_getBaseDirection = _bg.function('ubidi_getBaseDirection', ctypes.c_int,
+                                      (ctypes_P_UChar, _bg.IN, 'text'),
+                                      (ctypes.c_int32, _bg.IN, 'length'))
+ubidi_getParaLevel = _bg.function('ubidi_getParaLevel', ctypes_UBiDiLevel, _pBiDi)
+ubidi_countParagraphs = _bg.function('ubidi_countParagraphs', ctypes.c_int32, _pBiDi)
+ubidi_getParagraph = _bg.function('ubidi_getParagraph', ctypes.c_int32, IcuErrChecker.errcheck,
+                                  _pBiDi,
+                                  (ctypes.c_int32, _bg.IN, 'charIndex'),
+                                  (ctypes_P_c_int32, _bg.OUT, 'pParaStart'),
+                                  (ctypes_P_c_int32, _bg.OUT, 'pParaLimit'),
+                                  (ctypes_P_UBiDiLevel, _bg.OUT, 'pParaLevel'),
+                                  _pErrorCode)
+ubidi_getParagraphByIndex = _bg.function('ubidi_getParagraphByIndex', None, IcuErrChecker.errcheck,
+                                         _pBiDi,
+                                         (ctypes.c_int32, _bg.IN, 'paraIndex'),
+                                         (ctypes_P_c_int32, _bg.OUT, 'pParaStart'),
+                                         (ctypes_P_c_int32, _bg.OUT, 'pParaLimit'),
+                                         (ctypes_P_UBiDiLevel, _bg.OUT, 'pParaLevel'),
+                                         _pErrorCode)
+ubidi_getLevels = _bg.function('ubidi_getLevels', ctypes_P_UBiDiLevel, IcuErrChecker.errcheck, _pBiDi, _pErrorCode)
 ubidi_getLength = _bg.function('ubidi_getLength', ctypes.c_int32, _pBiDi)
 ubidi_countRuns = _bg.function('ubidi_countRuns', ctypes.c_int32, IcuErrChecker.errcheck, _pBiDi, _pErrorCode)
 ubidi_getProcessedLength = _bg.function('ubidi_getProcessedLength', ctypes.c_int32, _pBiDi)
@@ -509,20 +859,267 @@ ubidi_getVisualRun = _bg.function('ubidi_getVisualRun', ctypes.c_int,
                                   (ctypes.c_int32, _bg.IN, 'runIndex'),
                                   (ctypes_P_c_int32, _bg.OUT, 'pLogicalStart'),
                                   (ctypes_P_c_int32, _bg.OUT, 'pLength'))
+ubidi_getLogicalRun = _bg.function('ubidi_getLogicalRun', None,
+                                   _pBiDi,
+                                   (ctypes.c_int32, _bg.IN, 'logicalPosition'),
+                                   (ctypes_P_c_int32, _bg.OUT, 'pLogicalLimit'),
+                                   (ctypes_P_UBiDiLevel, _bg.OUT, 'pLevel'))
 ubidi_getLogicalMap = _bg.function('ubidi_getLogicalMap', None, IcuErrChecker.errcheck,
                                    _pBiDi,
                                    (ctypes_P_c_int32, _bg.OUT, 'indexMap'),
                                    _pErrorCode)
+ubidi_getVisualMap = _bg.function('ubidi_getVisualMap', None, IcuErrChecker.errcheck,
+                                  _pBiDi,
+                                  (ctypes_P_c_int32, _bg.OUT, 'indexMap'),
+                                  _pErrorCode)
+ubidi_getVisualIndex = _bg.function('ubidi_getVisualIndex', ctypes.c_int32, IcuErrChecker.errcheck,
+                                    _pBiDi,
+                                    (ctypes.c_int32, _bg.IN, 'logicalIndex'),
+                                    _pErrorCode)
+ubidi_getLogicalIndex = _bg.function('ubidi_getLogicalIndex', ctypes.c_int32, IcuErrChecker.errcheck,
+                                     _pBiDi,
+                                     (ctypes.c_int32, _bg.IN, 'visualIndex'),
+                                     _pErrorCode)
+ubidi_invertMap = _bg.function('ubidi_invertMap', None,
+                               (ctypes_P_c_int32, _bg.IN, 'srcMap'),
+                               (ctypes_P_c_int32, _bg.OUT, 'destMap'),
+                               (ctypes.c_int32, _bg.IN, 'length'))
+
+# Bindings without errcheck for the methods of class Bidi. Each Bidi object
+# passes its own UErrorCode and checks it inline. This avoids the overhead of
+# IcuErrChecker.errcheck and of the thread local lookup of the default checker.
+_ubidi_setPara = _bg.unchecked(ubidi_setPara)
+_ubidi_setLine = _bg.unchecked(ubidi_setLine)
+_ubidi_getParagraph = _bg.unchecked(ubidi_getParagraph)
+_ubidi_getParagraphByIndex = _bg.unchecked(ubidi_getParagraphByIndex)
+_ubidi_getLevels = _bg.unchecked(ubidi_getLevels)
+_ubidi_countRuns = _bg.unchecked(ubidi_countRuns)
+_ubidi_writeReordered = _bg.unchecked(ubidi_writeReordered)
+_ubidi_getLogicalMap = _bg.unchecked(ubidi_getLogicalMap)
+_ubidi_getVisualMap = _bg.unchecked(ubidi_getVisualMap)
+_ubidi_getVisualIndex = _bg.unchecked(ubidi_getVisualIndex)
+_ubidi_getLogicalIndex = _bg.unchecked(ubidi_getLogicalIndex)
+
+
+def invert_map(indexMap):
+    """Invert an index map.
+
+    The index mapping of the argument map is inverted and returned as
+    an array of int32. This works for a logical map as well as for a visual
+    map. Indexes of the inverted map, that are not the target of an index
+    of *indexMap*, are :data:`UBIDI_MAP_NOWHERE`.
+    """
+    if not isinstance(indexMap, array.array) or indexMap.typecode != INT32_TYPECODE:
+        indexMap = array.array(INT32_TYPECODE, indexMap)
+    length = len(indexMap)
+    result = int32_array(max(indexMap) + 1 if length else 0)
+    if length:
+        ubidi_invertMap(int32_array_pointer(indexMap), int32_array_pointer(result), length)
+    return result
+
+
+# Characters, that can make the layout of a text differ from the trivial
+# left-to-right layout: characters of the bidi classes R, AL and AN, the
+# explicit directional formatting characters and the characters removed by
+# UBIDI_REMOVE_BIDI_CONTROLS. The ranges include the unassigned code points,
+# whose default bidi class is R or AL.
+_NON_LTR_RANGES = (u"\u0590-\u08ff\u200c-\u200f\u202a-\u202e\u2066-\u2069"
+                   u"\ufb1d-\ufdff\ufe70-\ufefe")
+if sys.maxunicode > 0xffff:
+    _non_ltr_search = re.compile(u"[" + _NON_LTR_RANGES + u"\U00010800-\U00010fff\U0001e800-\U0001efff]").search
+    _count_supplementary = re.compile(u"[\U00010000-\U0010ffff]").findall
+else:
+    # narrow build: match the lead surrogates of U+10800-U+10FFF and U+1E800-U+1EFFF
+    _non_ltr_search = re.compile(u"[" + _NON_LTR_RANGES + u"\ud802\ud803\ud83a\ud83b]").search
+    _count_supplementary = lambda text: ()  # noqa: E731
+
+# Write options, that change the text of a left-to-right run
+_NON_LTR_WRITE_OPTIONS = (UBidiWriteReorderedOpt.UBIDI_INSERT_LRM_FOR_NUMERIC |
+                          UBidiWriteReorderedOpt.UBIDI_OUTPUT_REVERSE)
+
+
+def levelbuf_from_buffer(levels, length):
+    """Return a ctypes array of at least *length* UBiDiLevel values for *levels*.
+
+    *levels* is a ctypes array or pointer or any object supporting the buffer
+    protocol with an item size of 1, i.e. bytes, bytearray, memoryview or a
+    numpy uint8 array. The returned array shares the memory of writable
+    C-contiguous buffers. Otherwise it is a copy, because ubidi_setPara may
+    modify the levels.
+    """
+    if isinstance(levels, (ctypes.Array, ctypes._Pointer)):
+        return levels
+    view = memoryview(levels)
+    if view.itemsize != 1:
+        raise TypeError("embedding levels must have an item size of 1")
+    size, writable = _view_info(view)
+    if size < length:
+        raise ValueError("{} embedding levels required, got {}".format(length, size))
+    array_type = ctypes_UBiDiLevel * size
+    if not writable:
+        return array_type.from_buffer_copy(view.tobytes())
+    return array_type.from_buffer(levels)
+
+
+def base_direction(text):
+    """Return the base direction of *text* as :class:`UBiDiDirection`.
+
+    The base direction is the direction of the first strong character
+    or :attr:`UBiDiDirection.UBIDI_NEUTRAL`. This is much cheaper than
+    running the Bidi algorithm.
+    """
+    if not isinstance(text, unicode):
+        text = unicode(text)
+    buf, length = ucharbuf_from_text(text)
+    return UBiDiDirection(ubidi_getBaseDirection(buf, length))
+
+
+def base_directions(texts):
+    """Return the base directions of the iterable *texts* as an array of signed chars.
+
+    See :func:`base_direction`. The function reuses a single buffer for all texts.
+    """
+    result = array.array('b')
+    buf = UCharBuffer()
+    for text in texts:
+        if not isinstance(text, unicode):
+            text = unicode(text)
+        length = buf.store(text)
+        result.append(ubidi_getBaseDirection(buf.buf, length))
+    return result
+
+
+class BidiRuns(object):
+    """A compact sequence of runs.
+
+    The runs are stored in the arrays :attr:`directions`, :attr:`starts`
+    and :attr:`lengths`. For logical runs the array :attr:`levels` holds
+    the embedding levels, otherwise it is None. Item *i* of the sequence
+    is the tuple ``(direction, logical_start, length)`` as returned by
+    :meth:`Bidi.get_visual_run`.
+    """
+    __slots__ = ('directions', 'starts', 'lengths', 'levels')
+
+    def __init__(self, directions, starts, lengths, levels=None):
+        self.directions = directions
+        self.starts = starts
+        self.lengths = lengths
+        self.levels = levels
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        return self.directions[index], self.starts[index], self.lengths[index]
+
+    def __iter__(self):
+        return iter(zip(self.directions, self.starts, self.lengths))
+
+    def __repr__(self):
+        return "{}({!r})".format(self.__class__.__name__, list(self))
+
+
+class BidiParagraph(collections.namedtuple('BidiParagraph', 'index start limit level')):
+    """A paragraph of a text: index, UTF-16 start and limit and paragraph level"""
+    __slots__ = ()
+
+    @property
+    def direction(self):
+        """The base direction of the paragraph"""
+        return UBiDiDirection(self.level & 1)
+
+
+def _iter_chunks(source, chunk_size):
+    if hasattr(source, 'read'):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        for text in source:
+            for i in range(0, len(text), chunk_size):
+                yield text[i:i + chunk_size]
 
 
 class Bidi(object):
+    """An object that holds the bidi information of a paragraph.
+
+    If *ltr_fast_path* is true, :meth:`set_para` checks if the text contains
+    characters, that could make its layout differ from the trivial
+    left-to-right layout. If it contains no such characters, the paragraph
+    level is :attr:`UBiDiLevel.UBIDI_LTR` or :attr:`UBiDiLevel.UBIDI_DEFAULT_LTR`
+    and the reordering mode is :attr:`UBiDiReorderingMode.UBIDI_REORDER_DEFAULT`,
+    the call of ``ubidi_setPara`` is deferred until a method actually needs
+    the ICU object. Methods like :meth:`get_reordered`, :meth:`count_runs`
+    and :meth:`get_visual_run` return the trivial result without calling ICU.
+
+    The fast path relies on the properties of this class to change the
+    reordering mode and options. Set *ltr_fast_path* to false, if you call
+    ``ubidi_*`` functions on :attr:`pbidi` directly.
+
+    If *max_length* or *max_run_count* is greater than 0, the ICU object
+    is created with ``ubidi_openSized``. ICU preallocates the memory for
+    texts of up to *max_length* UTF-16 code units and *max_run_count* runs.
+    With a *max_length* greater than 0 ICU does not allocate memory later,
+    therefore :meth:`set_para` raises :exc:`IcuMemoryError` for longer texts,
+    even if they could take the fast path.
+    """
     _all_bidi_objects = {}
 
-    def __init__(self):
-        self.pbidi = ubidi_open()
+    # reordering options, that rule out the fast path
+    _NON_LTR_OPTIONS = UBiDiReorderingOption.UBIDI_OPTION_INSERT_MARKS | UBiDiReorderingOption.UBIDI_OPTION_STREAMING
+
+    def __init__(self, ltr_fast_path=True, max_length=0, max_run_count=0):
+        self.ltr_fast_path = ltr_fast_path
+        self.max_length = max_length
+        # the text of a trivial LTR paragraph, if ubidi_setPara has been deferred
+        self._ltr_text = None
+        self._ltr_para_level = None
+        self._ltr_mode = True
+        self._bidi_key = None
+        # the error code for the unchecked ICU calls, see _raise_error
+        self._err = ctypes_UErrorCode(IcuErrChecker.U_ZERO_ERROR)
+        self._perr = ctypes.byref(self._err)
+        if max_length > 0 or max_run_count > 0:
+            self.pbidi = ubidi_openSized(max_length, max_run_count, IcuErrChecker.DEFAULT_CHECKER)
+        else:
+            self.pbidi = ubidi_open()
+        if not self.pbidi:
+            raise IcuMemoryError(IcuErrChecker.U_MEMORY_ALLOCATION_ERROR, "ubidi_open failed")
         addr = ctypes.addressof(self.pbidi.contents)
         wr = weakref.ref(self.pbidi, self.__on_bidi_delete)
-        self._all_bidi_objects[id(wr)] = (addr, wr)
+        self._bidi_key = id(wr)
+        self._all_bidi_objects[self._bidi_key] = (addr, wr)
+        # grow-only buffers for the paragraph text and the reordered text
+        self._inbuf = UCharBuffer()
+        self._outbuf = UCharBuffer()
+        self._levelbuf = None
+        # the buffer ICU reads the paragraph text from
+        self._textbuf = self._inbuf
+        # weak references to the views of get_levels on ICU memory
+        self._level_views = []
+
+    def _raise_error(self):
+        # Called, if an unchecked ICU call failed. ICU functions do nothing,
+        # if the error code indicates a failure. Therefore reset it.
+        err = self._err
+        code = err.value
+        err.value = IcuErrChecker.U_ZERO_ERROR
+        raise IcuErrChecker.exception(code)
+
+    def _release_level_views(self):
+        # The views returned by get_levels refer to memory, that ICU frees or
+        # reuses. Release them before ICU changes the memory.
+        views = self._level_views
+        for ref in views:
+            view = ref()
+            if view is not None:
+                try:
+                    view.release()
+                except BufferError:
+                    pass  # the view is exported, i.e. to a numpy array
+        del views[:]
 
     @classmethod
     def __on_bidi_delete(cls, wref):
@@ -532,6 +1129,54 @@ class Bidi(object):
         except Exception:
             pass
 
+    def close(self):
+        """Free the ICU object and the buffers.
+
+        Without an explicit call, the ICU object gets freed when this object
+        is garbage collected. Line objects of a closed paragraph object must
+        not be used. Calling :meth:`close` more than once has no effect.
+        """
+        key = self._bidi_key
+        if key is None:
+            return
+        self._bidi_key = None
+        self._release_level_views()
+        # dropping the weak reference disables the callback
+        del self._all_bidi_objects[key]
+        pbidi = self.pbidi
+        self.pbidi = ctypes_P_UBiDi()  # ICU functions check for NULL
+        self.ltr_fast_path = False
+        self._ltr_text = None
+        self._inbuf = self._outbuf = self._textbuf = UCharBuffer()
+        self._levelbuf = None
+        ubidi_close(pbidi)
+
+    @property
+    def closed(self):
+        return self._bidi_key is None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def release_buffers(self):
+        """Forget the current paragraph and free the text buffers.
+
+        Afterwards the object holds an empty paragraph. Use this method to
+        release the memory of a large paragraph without closing the object.
+        """
+        self._release_level_views()
+        self._ltr_text = None
+        self._levelbuf = None
+        self._inbuf = self._textbuf = UCharBuffer()
+        self._outbuf = UCharBuffer()
+        if not self.closed:
+            _ubidi_setPara(self.pbidi, self._inbuf.buf, 0, UBiDiLevel.UBIDI_LTR, None, self._perr)
+            if self._err.value > 0:
+                self._raise_error()
+
     @property
     def inverse(self):
         return ubidi_isInverse(self.pbidi)
@@ -539,6 +1184,7 @@ class Bidi(object):
     @inverse.setter
     def inverse(self, isInverse):
         ubidi_setInverse(self.pbidi, bool(isInverse))
+        self._update_ltr_mode()
 
     @property
     def reordering_mode(self):
@@ -547,6 +1193,7 @@ class Bidi(object):
     @reordering_mode.setter
     def reordering_mode(self, reorderingMode):
         ubidi_setReorderingMode(self.pbidi, reorderingMode)
+        self._update_ltr_mode()
 
     @property
     def reordering_options(self):
@@ -555,38 +1202,584 @@ class Bidi(object):
     @reordering_options.setter
     def reordering_options(self, reorderingOptions):
         ubidi_setReorderingOptions(self.pbidi, reorderingOptions)
+        self._update_ltr_mode()
+
+    def _update_ltr_mode(self):
+        # setInverse also sets the reordering mode
+        pbidi = self.pbidi
+        self._ltr_mode = (ubidi_getReorderingMode(pbidi) == UBiDiReorderingMode.UBIDI_REORDER_DEFAULT and
+                          not ubidi_getReorderingOptions(pbidi) & self._NON_LTR_OPTIONS)
+
+    def _is_trivial_ltr(self, text, paraLevel):
+        # A text longer than max_length takes the ICU path, which raises IcuMemoryError
+        return ((paraLevel == UBiDiLevel.UBIDI_LTR or paraLevel == UBiDiLevel.UBIDI_DEFAULT_LTR) and
+                self._ltr_mode and self.ltr_fast_path and _non_ltr_search(text) is None and
+                (self.max_length <= 0 or len(text) + len(_count_supplementary(text)) <= self.max_length))
+
+    def _ensure_para(self):
+        # Call the deferred ubidi_setPara, if required.
+        text = self._ltr_text
+        if text is None:
+            return
+        self._ltr_text = None
+        pbidi = self.pbidi
+        inbuf = self._textbuf = self._inbuf
+        length = inbuf.store(text)
+        mode = ubidi_getReorderingMode(pbidi)
+        options = ubidi_getReorderingOptions(pbidi)
+        # The mode or the options may have changed after set_para.
+        ubidi_setReorderingMode(pbidi, UBiDiReorderingMode.UBIDI_REORDER_DEFAULT)
+        ubidi_setReorderingOptions(pbidi, UBiDiReorderingOption.UBIDI_OPTION_DEFAULT)
+        try:
+            _ubidi_setPara(pbidi, inbuf.buf, length, self._ltr_para_level, None, self._perr)
+            if self._err.value > 0:
+                self._raise_error()
+        finally:
+            ubidi_setReorderingMode(pbidi, mode)
+            ubidi_setReorderingOptions(pbidi, options)
+
+    def _ltr_length(self):
+        text = self._ltr_text
+        return len(text) + len(_count_supplementary(text))
+
+    @property
+    def order_paragraphs_ltr(self):
+        return ubidi_isOrderParagraphsLTR(self.pbidi)
+
+    @order_paragraphs_ltr.setter
+    def order_paragraphs_ltr(self, orderParagraphsLTR):
+        ubidi_orderParagraphsLTR(self.pbidi, bool(orderParagraphsLTR))
 
     @property
     def length(self):
+        if self._ltr_text is not None:
+            return self._ltr_length()
         return ubidi_getLength(self.pbidi)
 
     @property
     def processed_length(self):
+        if self._ltr_text is not None:
+            return self._ltr_length()
         return ubidi_getProcessedLength(self.pbidi)
 
     @property
     def result_length(self):
+        if self._ltr_text is not None:
+            return self._ltr_length()
         return ubidi_getResultLength(self.pbidi)
 
     def set_para(self, text, paraLevel=UBiDiLevel.UBIDI_LTR, embeddingLevels=None):
+        """Perform the Unicode Bidi algorithm on the paragraph(s) *text*.
+
+        *embeddingLevels* may be None or a buffer of UBiDiLevel values, one
+        for each UTF-16 code unit of *text*. A writable buffer (i.e. a
+        bytearray or a numpy uint8 array) is used without copying; ICU may
+        modify its content. See :func:`levelbuf_from_buffer`.
+        """
         if not isinstance(text, unicode):
             text = unicode(text)
-        buf, bufsize = ucharbuf_from_text(text)
-        self._parabuf = buf  # keep the buffer alive
-        ubidi_setPara(self.pbidi, buf, bufsize, paraLevel, embeddingLevels, IcuErrChecker.DEFAULT_CHECKER)
+        if self._level_views:
+            self._release_level_views()
+        if embeddingLevels is None and self._is_trivial_ltr(text, paraLevel):
+            self._ltr_text = text
+            self._ltr_para_level = paraLevel
+            return
+        self._ltr_text = None
+        inbuf = self._textbuf = self._inbuf
+        length = inbuf.store(text)
+        if embeddingLevels is not None:
+            embeddingLevels = levelbuf_from_buffer(embeddingLevels, length)
+        # ICU keeps a pointer to the embedding levels
+        self._levelbuf = embeddingLevels
+        _ubidi_setPara(self.pbidi, inbuf.buf, length, paraLevel, embeddingLevels, self._perr)
+        if self._err.value > 0:
+            self._raise_error()
+
+    def set_para_utf16(self, buffer, paraLevel=UBiDiLevel.UBIDI_LTR, embeddingLevels=None):
+        """Perform the Unicode Bidi algorithm on UTF-16 text in native byte order.
+
+        *buffer* is an :class:`icu.UnicodeString` or an object supporting
+        the buffer protocol, i.e. bytes, bytearray, memoryview, mmap or an
+        array of uint16. ICU reads the text directly from the memory of bytes
+        objects and of writable C-contiguous buffers. Do not modify such a
+        buffer until the next call of :meth:`set_para` or
+        :meth:`set_para_utf16`. Other buffers get copied (see
+        :meth:`UCharMemory.from_buffer`). A :class:`icu.UnicodeString` gets
+        converted by a single call of its method ``encode``.
+
+        The text is not checked for the LTR fast path. For *embeddingLevels*
+        see :meth:`set_para`.
+        """
+        if isinstance(buffer, icu.UnicodeString):
+            buffer = buffer.encode(UCHAR_ENCODING)
+        textbuf = UCharMemory.from_buffer(buffer)
+        length = textbuf.length
+        if self._level_views:
+            self._release_level_views()
+        if embeddingLevels is not None:
+            embeddingLevels = levelbuf_from_buffer(embeddingLevels, length)
+        self._ltr_text = None
+        # ICU keeps pointers to the text and the embedding levels
+        self._textbuf = textbuf
+        self._levelbuf = embeddingLevels
+        _ubidi_setPara(self.pbidi, textbuf.buf, length, paraLevel, embeddingLevels, self._perr)
+        if self._err.value > 0:
+            self._raise_error()
 
     def count_runs(self):
-        return ubidi_countRuns(self.pbidi, IcuErrChecker.DEFAULT_CHECKER)
+        if self._ltr_text is not None:
+            return 1 if self._ltr_text else 0
+        n_runs = _ubidi_countRuns(self.pbidi, self._perr)
+        if self._err.value > 0:
+            self._raise_error()
+        return n_runs
+
+    def _needs_run_space(self, options):
+        # Only these options can make the output longer than result_length.
+        # See the description of the parameter destSize of ubidi_writeReordered.
+        return bool(int(options) & UBidiWriteReorderedOpt.UBIDI_INSERT_LRM_FOR_NUMERIC or
+                    self.reordering_options & UBiDiReorderingOption.UBIDI_OPTION_INSERT_MARKS)
+
+    def _reordered_size(self, with_runs):
+        pbidi = self.pbidi
+        size = max(ubidi_getLength(pbidi), ubidi_getResultLength(pbidi))
+        if with_runs:
+            size += 2 * _ubidi_countRuns(pbidi, self._perr)
+            if self._err.value > 0:
+                self._raise_error()
+        return size
+
+    def _write_reordered(self, options, with_runs, utf16=False):
+        # return the reordered text as unicode or, if utf16 is true, as UTF-16 bytes
+        maxsize = self._reordered_size(with_runs)
+        outbuf = self._outbuf
+        buf_len = _ubidi_writeReordered(self.pbidi, outbuf.reserve(maxsize), maxsize, options, self._perr)
+        if self._err.value > 0:
+            self._raise_error()
+        if utf16:
+            return outbuf.get_bytes(buf_len)
+        return outbuf.get_text(buf_len)
 
     def get_reordered(self, options):
-        n_runs = self.count_runs()
-        maxsize = self.length + 2 * n_runs
-        buf = ucharbuf_sized(maxsize)
-        buf_len = ubidi_writeReordered(self.pbidi, buf, maxsize, int(options), IcuErrChecker.DEFAULT_CHECKER)
-        return text_from_ucharbuf(buf, buf_len)
+        options = int(options)
+        if self._ltr_text is not None:
+            if not options & _NON_LTR_WRITE_OPTIONS:
+                return self._ltr_text
+            self._ensure_para()
+        return self._write_reordered(options, self._needs_run_space(options))
+
+    def get_reordered_utf16(self, options):
+        """Like :meth:`get_reordered`, but return UTF-16 bytes in native byte order."""
+        options = int(options)
+        if self._ltr_text is not None:
+            if not options & _NON_LTR_WRITE_OPTIONS:
+                return self._ltr_text.encode(UCHAR_ENCODING)
+            self._ensure_para()
+        return self._write_reordered(options, self._needs_run_space(options), True)
+
+    def reorder_many(self, texts, paraLevel=UBiDiLevel.UBIDI_LTR, options=0):
+        """Reorder each text of the iterable *texts* and yield the results.
+
+        This is equivalent to calling :meth:`set_para` and :meth:`get_reordered`
+        for each text, but it avoids most of the per text overhead: the
+        reordering mode and options are evaluated only once.
+
+        Do not use this :class:`Bidi` object for other purposes until the
+        generator is exhausted.
+        """
+        pbidi = self.pbidi
+        err = self._err
+        perr = self._perr
+        options = int(options)
+        with_runs = self._needs_run_space(options)
+        ltr_fast_path = (self.ltr_fast_path and self._ltr_mode and not options & _NON_LTR_WRITE_OPTIONS and
+                         (paraLevel == UBiDiLevel.UBIDI_LTR or paraLevel == UBiDiLevel.UBIDI_DEFAULT_LTR))
+        inbuf = self._textbuf = self._inbuf
+        for text in texts:
+            if not isinstance(text, unicode):
+                text = unicode(text)
+            if self._level_views:
+                self._release_level_views()
+            if ltr_fast_path and _non_ltr_search(text) is None:
+                self._ltr_text = text
+                self._ltr_para_level = paraLevel
+                yield text
+                continue
+            self._ltr_text = None
+            length = inbuf.store(text)
+            _ubidi_setPara(pbidi, inbuf.buf, length, paraLevel, None, perr)
+            if err.value > 0:
+                self._raise_error()
+            yield self._write_reordered(options, with_runs)
 
     def get_visual_run(self, runIndex):
+        if self._ltr_text is not None:
+            if runIndex == 0 and self._ltr_text:
+                return UBiDiDirection.UBIDI_LTR, 0, self._ltr_length()
+            self._ensure_para()
         start = ctypes.c_int32()
         length = ctypes.c_int32()
         direction = ubidi_getVisualRun(self.pbidi, int(runIndex), ctypes.byref(start), ctypes.byref(length))
         return direction, start.value, length.value
+
+    def _text_index(self, text, index):
+        # convert an UTF-16 index into the current paragraph text into an index of text
+        if self.length == len(text):
+            return index
+        return len(self._textbuf.get_text(index))
+
+    def iter_reordered(self, source, paraLevel=UBiDiLevel.UBIDI_LTR, options=0, chunk_size=65536):
+        """Reorder a large text in parts and yield the reordered parts.
+
+        *source* is either a file-like object opened in text mode or an
+        iterable of strings. The text is fed to ICU in chunks of up to
+        *chunk_size* characters using the option
+        :attr:`UBiDiReorderingOption.UBIDI_OPTION_STREAMING`. Text beyond
+        the processed length of a chunk gets resubmitted together with the
+        next chunk. The concatenation of the yielded parts is the reordered
+        text.
+
+        If a chunk does not contain a paragraph boundary, it gets combined
+        with the next chunk. Therefore the memory consumption is proportional
+        to the length of the longest paragraph.
+
+        While the generator is running, the option
+        :attr:`UBiDiReorderingOption.UBIDI_OPTION_STREAMING` and
+        :attr:`order_paragraphs_ltr` are set. The previous values get
+        restored, when the generator terminates.
+        """
+        streaming = UBiDiReorderingOption.UBIDI_OPTION_STREAMING
+        reordering_options = self.reordering_options
+        order_paragraphs_ltr = self.order_paragraphs_ltr
+        self.order_paragraphs_ltr = True
+        try:
+            chunks = _iter_chunks(source, chunk_size)
+            pending = u''
+            chunk = next(chunks, None)
+            while chunk is not None:
+                if not isinstance(chunk, unicode):
+                    chunk = unicode(chunk)
+                text = pending + chunk
+                chunk = next(chunks, None)
+                if chunk is None:
+                    # the last part
+                    self.reordering_options = reordering_options & ~streaming
+                    self.set_para(text, paraLevel)
+                    yield self.get_reordered(options)
+                    break
+                self.reordering_options = reordering_options | streaming
+                self.set_para(text, paraLevel)
+                processed = self.processed_length
+                if processed:
+                    yield self.get_reordered(options)
+                    pending = text[self._text_index(text, processed):]
+                else:
+                    # no paragraph boundary, submit a larger amount of text
+                    pending = text
+        finally:
+            self.reordering_options = reordering_options
+            self.order_paragraphs_ltr = order_paragraphs_ltr
+
+    def get_logical_map(self):
+        """Get the logical-to-visual index map as an array of int32.
+
+        The map is filled with a single ICU call. Indexes are UTF-16 indexes.
+        """
+        if self._ltr_text is not None:
+            return array.array(INT32_TYPECODE, range(self._ltr_length()))
+        pbidi = self.pbidi
+        length = ubidi_getProcessedLength(pbidi)
+        # with UBIDI_OPTION_INSERT_MARKS ICU requires space for result_length indexes
+        index_map = int32_array(max(length, ubidi_getResultLength(pbidi)))
+        if not index_map:
+            # ICU rejects the NULL address of an empty array
+            return index_map
+        _ubidi_getLogicalMap(pbidi, int32_array_pointer(index_map), self._perr)
+        if self._err.value > 0:
+            self._raise_error()
+        del index_map[length:]
+        return index_map
+
+    def get_visual_map(self):
+        """Get the visual-to-logical index map as an array of int32.
+
+        The map is filled with a single ICU call. Indexes are UTF-16 indexes.
+        """
+        if self._ltr_text is not None:
+            return array.array(INT32_TYPECODE, range(self._ltr_length()))
+        pbidi = self.pbidi
+        length = ubidi_getResultLength(pbidi)
+        # with UBIDI_OPTION_REMOVE_CONTROLS ICU requires space for processed_length indexes
+        index_map = int32_array(max(length, ubidi_getProcessedLength(pbidi)))
+        if not index_map:
+            return index_map
+        _ubidi_getVisualMap(pbidi, int32_array_pointer(index_map), self._perr)
+        if self._err.value > 0:
+            self._raise_error()
+        del index_map[length:]
+        return index_map
+
+    def get_visual_index(self, logicalIndex):
+        self._ensure_para()
+        index = _ubidi_getVisualIndex(self.pbidi, logicalIndex, self._perr)
+        if self._err.value > 0:
+            self._raise_error()
+        return index
+
+    def get_logical_index(self, visualIndex):
+        self._ensure_para()
+        index = _ubidi_getLogicalIndex(self.pbidi, visualIndex, self._perr)
+        if self._err.value > 0:
+            self._raise_error()
+        return index
+
+    def get_visual_runs(self):
+        """Get all runs in visual order as a :class:`BidiRuns` object."""
+        n_runs = self.count_runs()
+        directions = array.array('b', [0]) * n_runs
+        starts = int32_array(n_runs)
+        lengths = int32_array(n_runs)
+        if self._ltr_text is not None:
+            if n_runs:
+                lengths[0] = self._ltr_length()
+            return BidiRuns(directions, starts, lengths)
+        pbidi = self.pbidi
+        start = ctypes.c_int32()
+        length = ctypes.c_int32()
+        p_start = ctypes.byref(start)
+        p_length = ctypes.byref(length)
+        for i in range(n_runs):
+            directions[i] = ubidi_getVisualRun(pbidi, i, p_start, p_length)
+            starts[i] = start.value
+            lengths[i] = length.value
+        return BidiRuns(directions, starts, lengths)
+
+    def get_logical_runs(self):
+        """Get all runs in logical order as a :class:`BidiRuns` object.
+
+        The runs are computed with ``ubidi_getLogicalRun``. The attribute
+        :attr:`BidiRuns.levels` contains the embedding levels of the runs.
+        """
+        directions = array.array('b')
+        starts = array.array(INT32_TYPECODE)
+        lengths = array.array(INT32_TYPECODE)
+        levels = array.array('B')
+        if self._ltr_text is not None:
+            if self._ltr_text:
+                directions.append(UBiDiDirection.UBIDI_LTR)
+                starts.append(0)
+                lengths.append(self._ltr_length())
+                levels.append(UBiDiLevel.UBIDI_LTR)
+            return BidiRuns(directions, starts, lengths, levels)
+        pbidi = self.pbidi
+        length = ubidi_getProcessedLength(pbidi)
+        limit = ctypes.c_int32()
+        level = ctypes_UBiDiLevel()
+        p_limit = ctypes.byref(limit)
+        p_level = ctypes.byref(level)
+        start = 0
+        while start < length:
+            ubidi_getLogicalRun(pbidi, start, p_limit, p_level)
+            directions.append(level.value & 1)
+            starts.append(start)
+            lengths.append(limit.value - start)
+            levels.append(level.value)
+            start = limit.value
+        return BidiRuns(directions, starts, lengths, levels)
+
+    def get_levels(self):
+        """Get the embedding level of each UTF-16 code unit of the text as a memoryview.
+
+        The memoryview refers to the memory of the ICU object without a copy.
+        It is valid until the next call of :meth:`set_para`,
+        :meth:`release_buffers` or :meth:`close`. These methods release the
+        memoryview, i.e. it raises :exc:`ValueError` afterwards. Slices of
+        the memoryview and objects, that export it (i.e. numpy arrays), are
+        not released. Don't use them afterwards. Do not modify the levels.
+        """
+        if self._ltr_text is not None:
+            return memoryview(bytearray(self._ltr_length()))
+        pbidi = self.pbidi
+        length = ubidi_getProcessedLength(pbidi)
+        if not length:
+            # ICU fails for an empty paragraph
+            return memoryview(b'')
+        p_levels = _ubidi_getLevels(pbidi, self._perr)
+        if self._err.value > 0:
+            self._raise_error()
+        levels = (ctypes_UBiDiLevel * length).from_address(ctypes.addressof(p_levels.contents))
+        levels._bidi = self  # keep the ICU object alive
+        view = _byte_view(levels)
+        self._track_level_view(view)
+        return view
+
+    def _track_level_view(self, view):
+        if _RELEASABLE_VIEWS:
+            views = self._level_views
+            if len(views) >= 32:
+                views[:] = [ref for ref in views if ref() is not None]
+            views.append(weakref.ref(view))
+
+    @property
+    def direction(self):
+        """The direction of the text as :class:`UBiDiDirection`.
+
+        The direction is :attr:`UBiDiDirection.UBIDI_MIXED`, if the text
+        contains both left-to-right and right-to-left runs.
+        """
+        if self._ltr_text is not None:
+            return UBiDiDirection.UBIDI_LTR
+        return UBiDiDirection(ubidi_getDirection(self.pbidi))
+
+    @property
+    def para_level(self):
+        self._ensure_para()
+        return ubidi_getParaLevel(self.pbidi)
+
+    def count_paragraphs(self):
+        self._ensure_para()
+        return ubidi_countParagraphs(self.pbidi)
+
+    def get_paragraph(self, charIndex):
+        """Return the :class:`BidiParagraph` containing the UTF-16 index *charIndex*."""
+        self._ensure_para()
+        start = ctypes.c_int32()
+        limit = ctypes.c_int32()
+        level = ctypes_UBiDiLevel()
+        index = _ubidi_getParagraph(self.pbidi, charIndex, ctypes.byref(start), ctypes.byref(limit),
+                                    ctypes.byref(level), self._perr)
+        if self._err.value > 0:
+            self._raise_error()
+        return BidiParagraph(index, start.value, limit.value, level.value)
+
+    def get_paragraph_by_index(self, paraIndex):
+        return next(self.iter_paragraphs(paraIndex, paraIndex + 1))
+
+    def iter_paragraphs(self, first=0, last=None):
+        """Yield a :class:`BidiParagraph` for each paragraph of the text.
+
+        All paragraphs are analysed by a single call of :meth:`set_para`.
+        Use :meth:`set_line` to reorder a single paragraph.
+        """
+        self._ensure_para()
+        pbidi = self.pbidi
+        if last is None:
+            last = ubidi_countParagraphs(pbidi)
+        start = ctypes.c_int32()
+        limit = ctypes.c_int32()
+        level = ctypes_UBiDiLevel()
+        p_start = ctypes.byref(start)
+        p_limit = ctypes.byref(limit)
+        p_level = ctypes.byref(level)
+        err = self._err
+        perr = self._perr
+        for index in range(first, last):
+            _ubidi_getParagraphByIndex(pbidi, index, p_start, p_limit, p_level, perr)
+            if err.value > 0:
+                self._raise_error()
+            yield BidiParagraph(index, start.value, limit.value, level.value)
+
+    def get_text(self, start=0, limit=None):
+        """Return the text from the UTF-16 index *start* to *limit*.
+
+        The text is decoded from the UTF-16 buffer passed to ICU.
+        """
+        self._ensure_para()
+        if limit is None:
+            limit = ubidi_getProcessedLength(self.pbidi)
+        return self._textbuf.get_text(limit, start)
+
+    def set_line(self, start, limit):
+        """Return a :class:`BidiLine` object for the line from *start* to *limit*.
+
+        The line is derived from the bidi information of this paragraph
+        object. See :class:`BidiLine`.
+        """
+        return BidiLine(self, start, limit)
+
+    def lines(self, breaks):
+        """Return a list of :class:`BidiLine` objects.
+
+        *breaks* is an increasing sequence of line limits (UTF-16 indexes).
+        If the last limit is less than the length of the text, the remaining
+        text is the last line.
+        """
+        lines = []
+        start = 0
+        for limit in breaks:
+            lines.append(BidiLine(self, start, limit))
+            start = limit
+        length = self.processed_length
+        if start < length:
+            lines.append(BidiLine(self, start, length))
+        return lines
+
+    def iter_lines_reusing(self, breaks):
+        """Like :meth:`lines`, but yield a single :class:`BidiLine` object for all lines.
+
+        The line object is reset to the next line for each iteration, i.e.
+        it is only valid until the next iteration. Don't keep it, i.e.
+        ``list(bidi.iter_lines_reusing(breaks))`` contains the last line
+        several times. This saves creating an ICU object for each line.
+        """
+        length = self.processed_length
+        line = None
+        start = 0
+        for limit in breaks:
+            if line is None:
+                line = BidiLine(self, start, limit)
+            else:
+                line.reset(start, limit)
+            yield line
+            start = limit
+        if start < length:
+            if line is None:
+                line = BidiLine(self, start, length)
+            else:
+                line.reset(start, length)
+            yield line
+
+
+class BidiLine(Bidi):
+    """A line of a paragraph.
+
+    The line object uses the bidi information of the paragraph object *para*
+    for the text from the UTF-16 index *start* to *limit* (exclusive),
+    without running the Bidi algorithm again. It provides the same methods to
+    query the result as :class:`Bidi`, i.e. :meth:`get_reordered`, the runs
+    and maps. Indexes are relative to the start of the line.
+
+    A line must not cross a paragraph boundary. The line object is valid
+    until the next call of :meth:`Bidi.set_para` on the paragraph object.
+    :meth:`reset` moves the line object to another line of the paragraph.
+    """
+
+    def __init__(self, para, start, limit):
+        super(BidiLine, self).__init__(ltr_fast_path=False)
+        # ICU uses the text and the levels of the paragraph
+        self.para = para
+        self.reset(start, limit)
+
+    def reset(self, start, limit):
+        """Change the line to the text from *start* to *limit* of the paragraph.
+
+        Resetting a line object is cheaper than creating a new one.
+        """
+        para = self.para
+        para._ensure_para()
+        self._release_level_views()
+        _ubidi_setLine(para.pbidi, start, limit, self.pbidi, self._perr)
+        if self._err.value > 0:
+            self._raise_error()
+        self.start = start
+        self.limit = limit
+
+    def _track_level_view(self, view):
+        # the levels of a line may refer to the memory of the paragraph
+        super(BidiLine, self)._track_level_view(view)
+        self.para._track_level_view(view)
+
+    def get_text(self, start=0, limit=None):
+        if limit is None:
+            limit = self.limit - self.start
+        return self.para.get_text(self.start + start, self.start + limit)
@@ -0,0 +1,115 @@
+#
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+from __future__ import absolute_import, print_function, division
+
+import icu
+
+from ._impl import Bidi, BidiLine, UBiDiLevel
+
+__all__ = ['layout_paragraph']
+
+# see enum ULineBreakTag in ubrk.h
+UBRK_LINE_HARD = 100
+UBRK_LINE_HARD_LIMIT = 200
+
+
+def _break_opportunities(bidi, breakiter):
+    # Yield (boundary, mandatory) for each line break opportunity. The end of
+    # each bidi paragraph is a mandatory break, because a BidiLine can't
+    # cross a paragraph boundary.
+    para_limits = (paragraph.limit for paragraph in bidi.iter_paragraphs())
+    para_limit = next(para_limits, None)
+    for boundary in breakiter:
+        mandatory = UBRK_LINE_HARD <= breakiter.getRuleStatus() < UBRK_LINE_HARD_LIMIT
+        while para_limit is not None and para_limit <= boundary:
+            if para_limit < boundary:
+                yield para_limit, True
+            else:
+                mandatory = True
+            para_limit = next(para_limits, None)
+        yield boundary, mandatory
+
+
+def _line_breaks(bidi, breakiter, width, measure):
+    # Greedy line filling; yields the limits of the lines. Each segment
+    # between two break opportunities is measured once. The width of a line
+    # is the sum of the widths of its segments, the trailing whitespace of
+    # the last segment excluded.
+    line_start = 0
+    last_fit = None
+    fit_width = 0  # the width from line_start to last_fit
+    previous = 0
+    for boundary, mandatory in _break_opportunities(bidi, breakiter):
+        segment = bidi.get_text(previous, boundary)
+        previous = boundary
+        if last_fit is not None and fit_width + measure(segment.rstrip()) > width:
+            yield last_fit
+            line_start = last_fit
+            fit_width = 0
+        if mandatory:
+            yield boundary
+            line_start = boundary
+            last_fit = None
+            fit_width = 0
+        elif boundary > line_start:
+            last_fit = boundary
+            fit_width += measure(segment)
+    if last_fit is not None and last_fit > line_start:
+        yield last_fit
+
+
+def layout_paragraph(text, width, measure=len, paraLevel=UBiDiLevel.UBIDI_DEFAULT_LTR, options=0,
+                     locale=None, bidi=None):
+    """Break *text* into lines of at most *width* and return the lines in visual order.
+
+    The line breaks are the boundaries of an ICU line break iterator for the
+    *locale* (default: the default locale). The text between two break
+    opportunities is measured once by ``measure(segment_text)``. The width
+    of a line is the sum of the widths of its segments, the trailing
+    whitespace of the last segment excluded. A word wider than *width* gets
+    a line of its own. Mandatory breaks, i.e. after a newline, and the ends
+    of the bidi paragraphs are honoured.
+
+    The Bidi algorithm runs once for the whole text. Each line is reordered
+    with a :class:`BidiLine` object using the write *options*. Trailing
+    whitespace and line separators are not part of the result lines.
+
+    The break iterator and the Bidi object both use UTF-16 indexes,
+    therefore the line breaks are passed to ICU without index conversion.
+    """
+    if bidi is None:
+        bidi = Bidi()
+    bidi.set_para(text, paraLevel)
+    breakiter = icu.BreakIterator.createLineInstance(icu.Locale(locale) if locale else icu.Locale.getDefault())
+    breakiter.setText(text)
+    result = []
+    start = 0
+    for limit in _line_breaks(bidi, breakiter, width, measure):
+        line_text = bidi.get_text(start, limit)
+        # trailing whitespace and separators are BMP characters
+        content_limit = limit - (len(line_text) - len(line_text.rstrip()))
+        if content_limit > start:
+            result.append(BidiLine(bidi, start, content_limit).get_reordered(options))
+        else:
+            result.append(u'')
+        start = limit
+    return result
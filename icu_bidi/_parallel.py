@@ -0,0 +1,83 @@
+#
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+from __future__ import absolute_import, print_function, division
+
+import itertools
+import threading
+
+from ._impl import Bidi, UBiDiLevel, UBiDiReorderingMode, UBiDiReorderingOption
+
+__all__ = ['reorder_parallel']
+
+_thread_local = threading.local()
+
+
+def _thread_bidi():
+    # Each thread owns its own Bidi object
+    try:
+        return _thread_local.bidi
+    except AttributeError:
+        bidi = _thread_local.bidi = Bidi()
+        return bidi
+
+
+def _reorder_chunk(texts, paraLevel, options, mode, reordering_options):
+    bidi = _thread_bidi()
+    bidi.reordering_mode = mode
+    bidi.reordering_options = reordering_options
+    return list(bidi.reorder_many(texts, paraLevel, options))
+
+
+def _iter_lists(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def reorder_parallel(texts, workers=None, paraLevel=UBiDiLevel.UBIDI_LTR, options=0,
+                     mode=UBiDiReorderingMode.UBIDI_REORDER_DEFAULT,
+                     reordering_options=UBiDiReorderingOption.UBIDI_OPTION_DEFAULT,
+                     chunk_size=256, executor=None):
+    """Reorder the iterable *texts* using a pool of threads and return the list of results.
+
+    The texts are split into chunks of *chunk_size* texts. Each thread
+    reorders whole chunks with its own :class:`Bidi` object, set up with the
+    reordering *mode* and *reordering_options*. The ICU functions run
+    without holding the GIL, therefore large texts get reordered in parallel.
+    The results are in the order of *texts*.
+
+    *workers* is the number of threads and defaults to the number of CPUs.
+    Alternatively you can pass a :class:`concurrent.futures.ThreadPoolExecutor`
+    as *executor*; then *workers* is ignored.
+    """
+    if executor is None:
+        # imported here, because the modules take long to import
+        import multiprocessing
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(workers or multiprocessing.cpu_count()) as executor:
+            return reorder_parallel(texts, None, paraLevel, options, mode, reordering_options, chunk_size, executor)
+    args = (paraLevel, int(options), mode, reordering_options)
+    results = executor.map(lambda chunk: _reorder_chunk(chunk, *args), _iter_lists(texts, chunk_size))
+    return list(itertools.chain.from_iterable(results))
@@ -0,0 +1,145 @@
+#
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+from __future__ import absolute_import, print_function, division
+
+import collections
+import contextlib
+import threading
+
+from ._impl import Bidi, UBiDiReorderingMode, UBiDiReorderingOption
+
+__all__ = ['BidiPool']
+
+_DEFAULT_MODE = UBiDiReorderingMode.UBIDI_REORDER_DEFAULT
+_DEFAULT_OPTIONS = UBiDiReorderingOption.UBIDI_OPTION_DEFAULT
+
+
+class BidiPool(object):
+    """A thread-safe pool of :class:`Bidi` objects.
+
+    The pool keeps up to *maxsize* idle :class:`Bidi` objects. If the pool
+    is empty, :meth:`get` creates a new object (a miss). If the pool is full,
+    :meth:`put` discards the returned object. *prefill* objects are created
+    in advance.
+
+    :meth:`put` resets the settings of the returned object to the settings
+    of a new object. If the object holds a paragraph longer than
+    *max_buffer_size* UTF-16 code units or refers to memory of the caller
+    (see :meth:`Bidi.set_para_utf16`), :meth:`put` releases the buffers.
+
+    Usage::
+
+        pool = BidiPool()
+        with pool.acquire(mode=UBiDiReorderingMode.UBIDI_REORDER_RUNS_ONLY) as bidi:
+            bidi.set_para(text)
+            result = bidi.get_reordered(0)
+    """
+
+    def __init__(self, maxsize=16, prefill=0, factory=Bidi, max_buffer_size=16384):
+        self.maxsize = maxsize
+        self.factory = factory
+        self.max_buffer_size = max_buffer_size
+        self.hits = 0
+        self.misses = 0
+        self._ltr_fast_path = None
+        self._lock = threading.Lock()
+        self._idle = collections.deque(self._create() for _ in range(min(prefill, maxsize)))
+
+    def _create(self):
+        bidi = self.factory()
+        # the setting of the factory
+        self._ltr_fast_path = bidi.ltr_fast_path
+        return bidi
+
+    def get(self, mode=_DEFAULT_MODE, options=_DEFAULT_OPTIONS):
+        """Check out a :class:`Bidi` object and set its reordering mode and options.
+
+        Return the object with :meth:`put`.
+        """
+        with self._lock:
+            try:
+                bidi = self._idle.pop()
+            except IndexError:
+                bidi = None
+                self.misses += 1
+            else:
+                self.hits += 1
+        if bidi is None:
+            bidi = self._create()
+        # idle objects use the default mode and options
+        if mode != _DEFAULT_MODE:
+            bidi.reordering_mode = mode
+        if options != _DEFAULT_OPTIONS:
+            bidi.reordering_options = options
+        return bidi
+
+    def put(self, bidi):
+        """Reset the settings of *bidi* and return it to the pool.
+
+        A closed object is dropped.
+        """
+        if bidi.closed:
+            return
+        max_size = self.max_buffer_size
+        ltr_text = bidi._ltr_text
+        if (bidi._textbuf is not bidi._inbuf or bidi._levelbuf is not None or
+                (ltr_text is not None and len(ltr_text) > max_size) or
+                bidi._inbuf.capacity > max_size or bidi._outbuf.capacity > max_size):
+            bidi.release_buffers()
+        if self._ltr_fast_path is not None:
+            bidi.ltr_fast_path = self._ltr_fast_path
+        # setInverse changes the reordering mode
+        if bidi.inverse:
+            bidi.inverse = False
+        if bidi.order_paragraphs_ltr:
+            bidi.order_paragraphs_ltr = False
+        if bidi.reordering_mode != _DEFAULT_MODE:
+            bidi.reordering_mode = _DEFAULT_MODE
+        if bidi.reordering_options != _DEFAULT_OPTIONS:
+            bidi.reordering_options = _DEFAULT_OPTIONS
+        with self._lock:
+            if len(self._idle) < self.maxsize:
+                self._idle.append(bidi)
+                return
+        bidi.close()
+
+    @contextlib.contextmanager
+    def acquire(self, mode=_DEFAULT_MODE, options=_DEFAULT_OPTIONS):
+        """Context manager, that checks out a :class:`Bidi` object and returns it afterwards."""
+        bidi = self.get(mode, options)
+        try:
+            yield bidi
+        finally:
+            self.put(bidi)
+
+    def close(self):
+        """Close all idle objects"""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for bidi in idle:
+            bidi.close()
+
+    @property
+    def idle(self):
+        """The number of idle objects in the pool."""
+        return len(self._idle)
@@ -0,0 +1,184 @@
+#
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+"""Opt-in instrumentation of the ICU bindings and the Bidi methods
+
+While the instrumentation is disabled, the original functions are in place.
+Therefore it costs nothing. :func:`enable_stats` replaces the ``ubidi_*``
+bindings of :mod:`icu_bidi._impl`, the main methods of :class:`Bidi` and the
+UTF-16 conversion functions by wrappers, that count the calls and measure
+the time. :func:`disable_stats` restores the original functions.
+"""
+
+from __future__ import absolute_import, print_function, division
+
+import collections
+import functools
+import threading
+import time
+
+from . import _impl
+
+__all__ = ['CallStats', 'stats', 'reset_stats', 'enable_stats', 'disable_stats', 'stats_enabled',
+           'add_stats_hook', 'remove_stats_hook']
+
+_timer = getattr(time, 'perf_counter', time.time)
+
+
+class CallStats(collections.namedtuple('CallStats', 'calls time bytes max_bytes')):
+    """The statistics of a function.
+
+    *time* is the cumulative time of the calls in seconds. *bytes* is the
+    total number of bytes converted or allocated and *max_bytes* the maximum
+    of a single call. Both are 0 for functions without a size.
+    """
+    __slots__ = ()
+
+
+BIDI_METHODS = ('set_para', 'set_para_utf16', 'get_reordered', 'get_reordered_utf16', 'count_runs',
+                'get_visual_run', 'get_visual_runs', 'get_logical_runs', 'get_logical_map', 'get_visual_map',
+                'get_levels', 'get_text', 'set_line')
+"""The instrumented methods of :class:`Bidi`"""
+
+
+def _store_size(args, result):
+    return 2 * result
+
+
+def _get_text_size(args, result):
+    start = args[2] if len(args) > 2 else 0
+    return 2 * (args[1] - start)
+
+
+def _get_bytes_size(args, result):
+    return len(result)
+
+
+def _alloc_size(args, result):
+    return 2 * args[0]
+
+
+# (namespace, attribute, size function) of the UTF-16 conversions and buffer allocations
+_CONVERSIONS = ((_impl.UCharBuffer, 'store', _store_size),
+                (_impl.UCharBuffer, 'get_text', _get_text_size),
+                (_impl.UCharBuffer, 'get_bytes', _get_bytes_size),
+                (_impl.UCharMemory, 'get_text', _get_text_size),
+                (_impl.UCharMemory, 'get_bytes', _get_bytes_size),
+                (_impl, 'ucharbuf_alloc', _alloc_size))
+
+_lock = threading.Lock()
+_stats = {}  # name -> [calls, time, bytes, max_bytes]
+_hooks = []
+_originals = {}  # (namespace, attribute) -> original function
+
+
+def _record(name, elapsed, size):
+    with _lock:
+        stat = _stats.get(name)
+        if stat is None:
+            stat = _stats[name] = [0, 0.0, 0, 0]
+        stat[0] += 1
+        stat[1] += elapsed
+        if size is not None:
+            stat[2] += size
+            if size > stat[3]:
+                stat[3] = size
+    for hook in _hooks:
+        hook(name, elapsed, size)
+
+
+def _wrap(name, func, size_func=None):
+    @functools.wraps(func)
+    def wrapper(*args, **kw):
+        start = _timer()
+        result = func(*args, **kw)
+        elapsed = _timer() - start
+        _record(name, elapsed, None if size_func is None else size_func(args, result))
+        return result
+    return wrapper
+
+
+def _targets():
+    # yield (namespace, attribute, stats name, size function)
+    functions = set(id(f) for f in _impl._bg.functions)
+    for attr, value in list(vars(_impl).items()):
+        if id(value) in functions:
+            # the checked and the unchecked binding share the name
+            yield _impl, attr, attr.lstrip('_'), None
+    for attr in BIDI_METHODS:
+        yield _impl.Bidi, attr, 'Bidi.' + attr, None
+    for namespace, attr, size_func in _CONVERSIONS:
+        prefix = '' if namespace is _impl else namespace.__name__ + '.'
+        yield namespace, attr, prefix + attr, size_func
+
+
+def enable_stats():
+    """Start to record statistics. Has no effect, if the recording is enabled."""
+    with _lock:
+        if _originals:
+            return
+        for namespace, attr, name, size_func in _targets():
+            original = vars(namespace)[attr]
+            _originals[(namespace, attr)] = original
+            if isinstance(original, _impl.LazyFunction):
+                original = original.bind()
+            setattr(namespace, attr, _wrap(name, original, size_func))
+
+
+def disable_stats():
+    """Stop to record statistics and restore the original functions."""
+    with _lock:
+        for (namespace, attr), original in _originals.items():
+            setattr(namespace, attr, original)
+        _originals.clear()
+
+
+def stats_enabled():
+    return bool(_originals)
+
+
+def stats():
+    """Return a snapshot of the statistics as a dict of :class:`CallStats` by function name.
+
+    The names of the ICU functions are the ``ubidi_*`` names, the methods of
+    :class:`Bidi` are prefixed with ``Bidi.``.
+    """
+    with _lock:
+        return dict((name, CallStats(*stat)) for name, stat in _stats.items())
+
+
+def reset_stats():
+    with _lock:
+        _stats.clear()
+
+
+def add_stats_hook(hook):
+    """Call *hook(name, elapsed, size)* after each recorded call.
+
+    *elapsed* is the time of the call in seconds, *size* the number of bytes
+    or None. Hooks can forward the values to a metrics system. A hook must be
+    fast and thread-safe.
+    """
+    _hooks.append(hook)
+
+
+def remove_stats_hook(hook):
+    _hooks.remove(hook)
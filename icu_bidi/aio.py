@@ -0,0 +1,180 @@
+#
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+"""Reordering for asyncio applications (Python 3 only)
+
+Short texts are reordered directly in the event loop, because this is
+faster than a round trip to a thread. Long texts are reordered by a pool of
+threads, so that the event loop isn't blocked. ICU releases the GIL.
+"""
+
+from __future__ import absolute_import, print_function, division
+
+import asyncio
+import concurrent.futures
+import functools
+import os
+import threading
+import weakref
+
+from ._impl import UBiDiLevel, UBiDiReorderingMode, UBiDiReorderingOption, unicode
+from ._parallel import _thread_bidi
+
+__all__ = ['AsyncReorderer', 'reorder', 'INLINE_THRESHOLD']
+
+INLINE_THRESHOLD = 4096
+"""Texts shorter than this number of characters are reordered in the event loop"""
+
+
+def _reorder(text, paraLevel, options, mode, reordering_options):
+    bidi = _thread_bidi()
+    bidi.reordering_mode = mode
+    bidi.reordering_options = reordering_options
+    bidi.set_para(text, paraLevel)
+    return bidi.get_reordered(options)
+
+
+def _release_later(loop, semaphore, future):
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        # the event loop is closed
+        pass
+
+
+class AsyncReorderer(object):
+    """Reorder texts without blocking the event loop.
+
+    Texts shorter than *inline_threshold* characters are reordered
+    immediately. Other texts are reordered by a pool of *max_workers*
+    threads (default: as :class:`concurrent.futures.ThreadPoolExecutor` of
+    Python 3.8), each with its own :class:`Bidi` object. The pool is created
+    on first use.
+
+    At most *max_pending* texts (default: twice the number of threads) are
+    queued or processed by the pool. Further calls of :meth:`reorder` wait
+    for a free slot. If a waiting call gets cancelled, its text is not
+    reordered at all. A text, that is already being reordered, keeps its
+    slot until the thread is done.
+    """
+
+    def __init__(self, max_workers=None, max_pending=None, inline_threshold=INLINE_THRESHOLD):
+        if max_workers is None:
+            # the default of ThreadPoolExecutor since Python 3.8
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+        if max_pending is None:
+            max_pending = 2 * max_workers
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.inline_threshold = inline_threshold
+        self._executor = None
+        self._lock = threading.Lock()
+        # one semaphore per event loop
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _get_executor(self):
+        with self._lock:
+            executor = self._executor
+            if executor is None:
+                executor = self._executor = concurrent.futures.ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix='icu_bidi')
+            return executor
+
+    def _detach_executor(self):
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        return executor
+
+    def _get_semaphore(self, loop):
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_pending)
+        return semaphore
+
+    async def reorder(self, text, paraLevel=UBiDiLevel.UBIDI_LTR, options=0,
+                      mode=UBiDiReorderingMode.UBIDI_REORDER_DEFAULT,
+                      reordering_options=UBiDiReorderingOption.UBIDI_OPTION_DEFAULT):
+        """Reorder *text* and return the result.
+
+        The arguments have the same meaning as for :func:`reorder_parallel`.
+        """
+        if not isinstance(text, unicode):
+            text = unicode(text)
+        args = (text, paraLevel, int(options), mode, reordering_options)
+        if len(text) < self.inline_threshold:
+            return _reorder(*args)
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_semaphore(loop)
+        await semaphore.acquire()
+        try:
+            future = executor.submit(_reorder, *args)
+        except BaseException:
+            semaphore.release()
+            raise
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            # wrap_future cancels the future, if this task gets cancelled
+            if future.done():
+                semaphore.release()
+            else:
+                # the text is being reordered, release the slot afterwards
+                future.add_done_callback(functools.partial(_release_later, loop, semaphore))
+
+    def shutdown(self, wait=True):
+        """Shut down the thread pool. A later call of :meth:`reorder` creates a new one.
+
+        Don't call this method with *wait* set to true from a coroutine, because
+        it blocks the event loop. Use :meth:`aclose` instead.
+        """
+        executor = self._detach_executor()
+        if executor is not None:
+            executor.shutdown(wait)
+
+    async def aclose(self):
+        """Shut down the thread pool and wait for the pending texts without blocking the event loop."""
+        executor = self._detach_executor()
+        if executor is not None:
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+
+_default_reorderer = None
+_default_lock = threading.Lock()
+
+
+async def reorder(text, paraLevel=UBiDiLevel.UBIDI_LTR, options=0,
+                  mode=UBiDiReorderingMode.UBIDI_REORDER_DEFAULT,
+                  reordering_options=UBiDiReorderingOption.UBIDI_OPTION_DEFAULT):
+    """Reorder *text* using a shared :class:`AsyncReorderer` with default settings."""
+    global _default_reorderer
+    if _default_reorderer is None:
+        with _default_lock:
+            if _default_reorderer is None:
+                _default_reorderer = AsyncReorderer()
+    return await _default_reorderer.reorder(text, paraLevel, options, mode, reordering_options)
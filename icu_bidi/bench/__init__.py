@@ -0,0 +1,329 @@
+#
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+"""Benchmarks for icu_bidi
+
+Usage: python -m icu_bidi.bench [--json FILE] [--corpus NAME] [--operation NAME]
+
+Each operation is measured for each corpus of :data:`CORPORA`. The results
+are the operations (texts) per second and the peak of the memory allocated
+by Python per operation, as measured by :mod:`tracemalloc`.
+"""
+
+from __future__ import absolute_import, print_function, division
+
+import ctypes
+import gc
+import os.path
+import platform
+import subprocess
+import sys
+import timeit
+
+import icu
+
+from icu_bidi import _impl as I
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2
+    tracemalloc = None
+
+LTR_TEXTS = [u"File not found", u"Latin 123 (x) 4.5", u"2018-07-22 12:00:01 INFO server started on port 8080",
+             u"\U0001f600 emoji"] * 25
+
+RTL_TEXTS = [u"\u0645\u0631\u062d\u0628\u0627 \u0628\u0627\u0644\u0639\u0627\u0644\u0645",
+             u"\u0647\u0630\u0627 \u0646\u0635 \u0639\u0631\u0628\u064a \u0642\u0635\u064a\u0631",
+             u"\u05e9\u05dc\u05d5\u05dd \u05e2\u05d5\u05dc\u05dd",
+             u"\u05d6\u05d4\u05d5 \u05d8\u05e7\u05e1\u05d8 \u05d1\u05e2\u05d1\u05e8\u05d9\u05ea"] * 25
+
+MIXED_TEXTS = [u"\u0627\u0644\u0633\u0639\u0631 \u0661\u0662\u0663\u066b\u0665\u0660 \u0631\u064a\u0627\u0644",
+               u"\u0631\u0642\u0645 \u0627\u0644\u0647\u0627\u062a\u0641 0123-456-789",
+               u"\u0627\u0644\u0637\u0644\u0628 \u0631\u0642\u0645 42 \u0645\u0646 2018/07/22 "
+               u"\u0628\u0642\u064a\u0645\u0629 99.95 EUR",
+               u"\u05e2\u05de\u05d5\u05d3 12 \u05de\u05ea\u05d5\u05da 345 (\u05d2\u05e8\u05e1\u05d4 2.1)"] * 25
+
+LONG_TEXTS = [u"\n".join(LTR_TEXTS + RTL_TEXTS + MIXED_TEXTS) * 20,
+              u" ".join(MIXED_TEXTS) * 10]
+
+TINY_TEXTS = [u"a", u"1", u"\u05d0", u"\u0627", u"ab", u"12", u"\u05d0\u05d1", u" ", u"x1", u"\u06751"] * 100
+
+CORPORA = {
+    'ltr': LTR_TEXTS,
+    'rtl': RTL_TEXTS,
+    'mixed': MIXED_TEXTS,
+    'long': LONG_TEXTS,
+    'tiny': TINY_TEXTS,
+}
+"""The text profiles: pure LTR, pure Arabic/Hebrew, RTL mixed with numbers,
+long documents and many tiny strings"""
+
+PARA_LEVEL = I.UBiDiLevel.UBIDI_DEFAULT_LTR
+WRITE_OPTIONS = I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING
+
+
+def ops_per_second(func, n_ops, number=10, repeat=3):
+    """Return the number of operations per second, if a call of *func* performs *n_ops* operations."""
+    return n_ops * number / min(timeit.repeat(func, number=number, repeat=repeat))
+
+
+def peak_bytes(func):
+    """Return the peak of the memory allocated during a call of *func* or None without tracemalloc"""
+    if tracemalloc is None:
+        return None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _prepared(texts):
+    # one Bidi object per text, set_para already done
+    bidis = []
+    for text in texts:
+        bidi = I.Bidi()
+        bidi.set_para(text, PARA_LEVEL)
+        bidis.append(bidi)
+    return bidis
+
+
+def op_set_para(texts):
+    bidi = I.Bidi()
+
+    def run():
+        for text in texts:
+            bidi.set_para(text, PARA_LEVEL)
+    return run
+
+
+def op_get_reordered(texts):
+    bidis = _prepared(texts)
+
+    def run():
+        for bidi in bidis:
+            bidi.get_reordered(WRITE_OPTIONS)
+    return run
+
+
+def op_visual_runs(texts):
+    bidis = _prepared(texts)
+
+    def run():
+        for bidi in bidis:
+            for i in range(bidi.count_runs()):
+                bidi.get_visual_run(i)
+    return run
+
+
+def op_logical_map(texts):
+    bidis = _prepared(texts)
+
+    def run():
+        for bidi in bidis:
+            bidi.get_logical_map()
+    return run
+
+
+def op_reorder(texts):
+    bidi = I.Bidi()
+
+    def run():
+        for text in texts:
+            bidi.set_para(text, PARA_LEVEL)
+            bidi.get_reordered(WRITE_OPTIONS)
+    return run
+
+
+def op_raw(texts):
+    # the Bidi object owns the ICU object
+    bidi = I.Bidi(ltr_fast_path=False)
+    pbidi = bidi.pbidi
+    bufs = [I.ucharbuf_from_text(text) for text in texts]
+    # UBIDI_DO_MIRRORING doesn't change the length of the text
+    size = max(length for buf, length in bufs)
+    outbuf = I.ucharbuf_sized(size)
+    checker = I.IcuErrChecker.DEFAULT_CHECKER
+
+    def run():
+        for buf, length in bufs:
+            I.ubidi_setPara(pbidi, buf, length, PARA_LEVEL, None, checker)
+            for i in range(I.ubidi_countRuns(pbidi, checker)):
+                I.ubidi_getVisualRun(pbidi, i, None, None)
+            I.ubidi_writeReordered(pbidi, outbuf, size, WRITE_OPTIONS, checker)
+    run.bidi = bidi
+    return run
+
+
+OPERATIONS = {
+    'set_para': op_set_para,
+    'get_reordered': op_get_reordered,
+    'visual_runs': op_visual_runs,
+    'logical_map': op_logical_map,
+    'set_para+get_reordered': op_reorder,
+    'raw_ubidi': op_raw,
+}
+"""Each operation is a function, that returns a function to be timed.
+The timed function processes all texts of a corpus."""
+
+
+def run_suite(corpora=None, operations=None, number=10, repeat=3):
+    """Run the operations for the corpora and return a list of result dicts"""
+    results = []
+    for corpus in sorted(corpora or CORPORA):
+        texts = CORPORA[corpus]
+        for operation in sorted(operations or OPERATIONS):
+            func = OPERATIONS[operation](texts)
+            func()  # warm up
+            peak = peak_bytes(func)
+            results.append({
+                'corpus': corpus,
+                'operation': operation,
+                'texts': len(texts),
+                'chars': sum(len(text) for text in texts),
+                'ops_per_sec': ops_per_second(func, len(texts), number, repeat),
+                'peak_bytes_per_op': None if peak is None else peak / len(texts),
+            })
+    return results
+
+
+def environment():
+    """Return a dict describing the environment of the benchmark"""
+    return {
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'icu_version': icu.ICU_VERSION,
+        'pyicu_version': icu.VERSION,
+        'icu_library': I._bg.lib._name,
+    }
+
+
+def bench_ltr_fast_path(texts=LTR_TEXTS):
+    """Compare set_para() + get_reordered() with and without the LTR fast path"""
+    results = {}
+    for ltr_fast_path in (False, True):
+        bidi = I.Bidi(ltr_fast_path=ltr_fast_path)
+
+        def run():
+            for text in texts:
+                bidi.set_para(text, I.UBiDiLevel.UBIDI_DEFAULT_LTR)
+                bidi.get_reordered(0)
+        results[ltr_fast_path] = ops_per_second(run, len(texts))
+    return results[False], results[True]
+
+
+def bench_error_checking(texts=LTR_TEXTS):
+    """Compare ubidi_setPara + ubidi_countRuns with IcuErrChecker and with an inline checked error code"""
+    pbidi = I.ubidi_open()
+    try:
+        bufs = [I.ucharbuf_from_text(text) for text in texts]
+        level = I.UBiDiLevel.UBIDI_DEFAULT_LTR
+        checker = I.IcuErrChecker.DEFAULT_CHECKER
+
+        def run_checker():
+            for buf, length in bufs:
+                I.ubidi_setPara(pbidi, buf, length, level, None, checker)
+                I.ubidi_countRuns(pbidi, checker)
+
+        err = I.ctypes_UErrorCode()
+        perr = ctypes.byref(err)
+
+        def run_inline():
+            for buf, length in bufs:
+                I._ubidi_setPara(pbidi, buf, length, level, None, perr)
+                if err.value > 0:
+                    raise I.IcuErrChecker.exception(err.value)
+                I._ubidi_countRuns(pbidi, perr)
+                if err.value > 0:
+                    raise I.IcuErrChecker.exception(err.value)
+
+        return ops_per_second(run_checker, len(bufs)), ops_per_second(run_inline, len(bufs))
+    finally:
+        I.ubidi_close(pbidi)
+
+
+_IMPORT_SCRIPT = """
+import time
+start = time.time()
+import icu
+icu_done = time.time()
+import icu_bidi
+done = time.time()
+icu_bidi.Bidi().set_para(u"x")
+print(icu_done - start, done - icu_done, time.time() - done)
+"""
+
+
+def bench_import_time(repeat=5):
+    """Measure the import time of icu and icu_bidi in fresh interpreters.
+
+    Returns the best times in seconds of ``import icu``, ``import icu_bidi``
+    and of the first call, that loads the library and binds the functions.
+    """
+    env = dict(os.environ)
+    package_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env['PYTHONPATH'] = os.pathsep.join([package_dir] + [p for p in [env.get('PYTHONPATH')] if p])
+    times = []
+    for i in range(repeat):
+        output = subprocess.check_output([sys.executable, '-W', 'ignore', '-c', _IMPORT_SCRIPT], env=env)
+        times.append([float(t) for t in output.split()])
+    return tuple(min(t) for t in zip(*times))
+
+
+def comparisons():
+    """Return the results of the comparisons of alternative code paths as a dict"""
+    slow, fast = bench_ltr_fast_path()
+    result = {'ltr_fast_path': {'without': slow, 'with': fast, 'speedup': fast / slow}}
+    slow, fast = bench_error_checking()
+    result['error_checking'] = {'IcuErrChecker': slow, 'inline': fast, 'speedup': fast / slow}
+    import_icu, import_icu_bidi, first_call = bench_import_time()
+    result['import_time'] = {'icu': import_icu, 'icu_bidi': import_icu_bidi, 'first_call': first_call}
+    return result
+
+
+def print_results(results, file=None):
+    print("{:8} {:24} {:>14} {:>14}".format("corpus", "operation", "ops/s", "peak bytes/op"), file=file)
+    for r in results:
+        peak = r['peak_bytes_per_op']
+        print("{:8} {:24} {:14.0f} {:>14}".format(r['corpus'], r['operation'], r['ops_per_sec'],
+                                                  "-" if peak is None else "{:.0f}".format(peak)), file=file)
+
+
+def print_comparisons(comparisons, file=None):
+    c = comparisons['ltr_fast_path']
+    print("set_para + get_reordered, LTR text", file=file)
+    print("  without fast path: {:12.0f} ops/s".format(c['without']), file=file)
+    print("  with fast path:    {:12.0f} ops/s".format(c['with']), file=file)
+    print("  speedup:           {:12.1f}".format(c['speedup']), file=file)
+    c = comparisons['error_checking']
+    print("ubidi_setPara + ubidi_countRuns", file=file)
+    print("  IcuErrChecker:     {:12.0f} ops/s".format(c['IcuErrChecker']), file=file)
+    print("  inline check:      {:12.0f} ops/s".format(c['inline']), file=file)
+    print("  speedup:           {:12.1f}".format(c['speedup']), file=file)
+    c = comparisons['import_time']
+    print("import time", file=file)
+    print("  import icu:        {:12.1f} ms".format(1000 * c['icu']), file=file)
+    print("  import icu_bidi:   {:12.1f} ms".format(1000 * c['icu_bidi']), file=file)
+    print("  first call:        {:12.1f} ms".format(1000 * c['first_call']), file=file)
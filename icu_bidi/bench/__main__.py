@@ -0,0 +1,75 @@
+#
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+"""Run the benchmarks of icu_bidi
+
+Usage: python -m icu_bidi.bench [--json FILE] [--corpus NAME] [--operation NAME]
+"""
+
+from __future__ import absolute_import, print_function, division
+
+import argparse
+import json
+import sys
+
+from icu_bidi import bench
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(prog='python -m icu_bidi.bench', description="Benchmarks for icu_bidi")
+    parser.add_argument('--json', metavar='FILE',
+                        help="write the results as JSON to FILE, use - for standard output")
+    parser.add_argument('-c', '--corpus', choices=sorted(bench.CORPORA), action='append',
+                        help="run the benchmarks for this corpus only, may be repeated")
+    parser.add_argument('-o', '--operation', choices=sorted(bench.OPERATIONS), action='append',
+                        help="run this operation only, may be repeated")
+    parser.add_argument('-n', '--number', type=int, default=10,
+                        help="number of runs per timing (default: %(default)s)")
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help="number of timings, the best one counts (default: %(default)s)")
+    parser.add_argument('--no-comparisons', dest='comparisons', action='store_false',
+                        help="skip the comparisons of alternative code paths")
+    return parser
+
+
+def main(argv=None):
+    args = make_parser().parse_args(argv)
+    data = {
+        'environment': bench.environment(),
+        'results': bench.run_suite(args.corpus, args.operation, args.number, args.repeat),
+    }
+    if args.comparisons:
+        data['comparisons'] = bench.comparisons()
+    if args.json is None:
+        bench.print_results(data['results'])
+        if args.comparisons:
+            bench.print_comparisons(data['comparisons'])
+        return
+    text = json.dumps(data, indent=2, sort_keys=True)
+    if args.json == '-':
+        print(text)
+    else:
+        with open(args.json, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,288 @@
+#
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+"""Bulk conversion of text files using a pool of processes
+"""
+
+from __future__ import absolute_import, print_function, division
+
+import codecs
+import collections
+import io
+import mmap
+import multiprocessing
+import os.path
+
+from ._impl import Bidi, UBiDiLevel, UBiDiReorderingMode, UBiDiReorderingOption, UCHAR_ENCODING
+from ._parallel import _iter_lists
+
+__all__ = ['reorder_files', 'reorder_mapped_file']
+
+# The Bidi object of a worker process
+_worker_bidi = None
+# The memory mapped input file of a worker process
+_worker_mmap = None
+
+
+def _init_worker(mode, reordering_options):
+    global _worker_bidi
+    bidi = _worker_bidi = Bidi()
+    bidi.reordering_mode = mode
+    bidi.reordering_options = reordering_options
+
+
+def _reorder_lines(lines, paraLevel, options):
+    # Reorder each line without its line end and return the concatenated result
+    texts = [line.rstrip(u'\r\n') for line in lines]
+    reordered = _worker_bidi.reorder_many(texts, paraLevel, options)
+    return u''.join(r + line[len(text):] for r, text, line in zip(reordered, texts, lines))
+
+
+def reorder_files(paths, out_dir, processes=None, paraLevel=UBiDiLevel.UBIDI_LTR, options=0,
+                  mode=UBiDiReorderingMode.UBIDI_REORDER_DEFAULT,
+                  reordering_options=UBiDiReorderingOption.UBIDI_OPTION_DEFAULT,
+                  encoding='utf-8', chunk_lines=10000):
+    """Reorder each line of the text files *paths* using a pool of processes.
+
+    The result of each file is written to a file of the same name in the
+    directory *out_dir*. The function returns the list of output paths.
+
+    Each of the *processes* worker processes (default: the number of CPUs)
+    creates a single :class:`Bidi` object with the given reordering *mode*
+    and *reordering_options*. The lines are sent to the workers in chunks of
+    *chunk_lines* lines. At most two chunks per process are pending at any
+    time, therefore the memory consumption does not depend on the size of
+    the files.
+    """
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    max_pending = 2 * processes
+    out_paths = []
+    pool = multiprocessing.Pool(processes, _init_worker, (mode, reordering_options))
+    try:
+        for path in paths:
+            out_path = os.path.join(out_dir, os.path.basename(path))
+            if os.path.abspath(out_path) == os.path.abspath(path):
+                raise ValueError("Output file {} would overwrite the input file".format(out_path))
+            with io.open(path, encoding=encoding, newline='') as src, \
+                    io.open(out_path, 'w', encoding=encoding, newline='') as dst:
+                pending = collections.deque()
+                for lines in _iter_lists(src, chunk_lines):
+                    pending.append(pool.apply_async(_reorder_lines, (lines, paraLevel, int(options))))
+                    if len(pending) >= max_pending:
+                        dst.write(pending.popleft().get())
+                while pending:
+                    dst.write(pending.popleft().get())
+            out_paths.append(out_path)
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return out_paths
+
+
+def _map_file(path):
+    # ACCESS_COPY gives a writable mapping. Therefore Bidi.set_para_utf16
+    # can use the memory without a copy. The file itself is never modified.
+    with io.open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+
+# the paragraph separators (bidi class B)
+_PARA_SEPARATORS = u'\n\r\x1c\x1d\x1e\x85\u2029'
+
+
+def _separator_bytes(encoding):
+    # return the code unit size and the encoded paragraph separators
+    newline = u'\n'.encode(encoding)
+    if len(u'\n\n'.encode(encoding)) != 2 * len(newline):
+        raise ValueError("Encodings with a byte order mark are not supported: " + encoding)
+    separators = []
+    for char in _PARA_SEPARATORS:
+        try:
+            separators.append(char.encode(encoding))
+        except UnicodeEncodeError:
+            # the encoding can't represent this separator
+            pass
+    return len(newline), separators
+
+
+def _find_aligned(mm, sub, start, end, unit):
+    # find sub at an offset, that is a multiple of the code unit size
+    pos = mm.find(sub, start, end)
+    while pos >= 0 and pos % unit:
+        pos = mm.find(sub, pos + 1, end)
+    return pos
+
+
+def _rfind_aligned(mm, sub, start, end, unit):
+    pos = mm.rfind(sub, start, end)
+    while pos >= 0 and pos % unit:
+        pos = mm.rfind(sub, start, pos + len(sub) - 1)
+    return pos
+
+
+def _paragraph_end(mm, start, end, unit, separators):
+    # Return the end of the last paragraph separator in mm[start:end] or -1.
+    best = -1
+    best_sep = None
+    for sep in separators:
+        # only the part after the best match so far
+        pos = _rfind_aligned(mm, sep, max(start, best + 1), end, unit)
+        if pos > best:
+            best, best_sep = pos, sep
+    if best < 0:
+        return -1
+    return best + len(best_sep)
+
+
+def _next_paragraph_end(mm, start, size, unit, separators):
+    # Return the end of the first paragraph separator in mm[start:] or -1.
+    best = -1
+    best_sep = None
+    for sep in separators:
+        pos = _find_aligned(mm, sep, start, size if best < 0 else best, unit)
+        if pos >= 0 and (best < 0 or pos < best):
+            best, best_sep = pos, sep
+    if best < 0:
+        return -1
+    return best + len(best_sep)
+
+
+def _iter_blocks(mm, unit, separators, block_size):
+    # Yield (start, end) of blocks of about block_size bytes. Each block
+    # except the last one ends with a paragraph separator. A paragraph is
+    # never split, therefore a block with a long paragraph is larger.
+    size = len(mm)
+    block_size = max(block_size - block_size % unit, unit)
+    # separators starts with LF and CR
+    crlf = separators[1] + separators[0]
+    start = 0
+    while start < size:
+        end = start + block_size
+        if end < size:
+            pos = _paragraph_end(mm, start, end, unit, separators)
+            if pos < 0:
+                # the paragraph is longer than block_size
+                pos = _next_paragraph_end(mm, end, size, unit, separators)
+            end = size if pos < 0 else pos
+            if end < size and mm[end - unit:end + unit] == crlf:
+                # ICU treats CR LF as a single separator
+                end += unit
+        else:
+            end = size
+        yield start, end
+        start = end
+
+
+def _reorder_block(bidi, data, encoding, paraLevel, options):
+    # Reorder the paragraphs of the encoded text data and return the encoded result
+    if encoding == codecs.lookup(UCHAR_ENCODING).name:
+        bidi.set_para_utf16(data, paraLevel)
+        return bidi.get_reordered_utf16(options)
+    bidi.set_para(codecs.decode(data, encoding), paraLevel)
+    return bidi.get_reordered(options).encode(encoding)
+
+
+def _init_mmap_worker(path, mode, reordering_options):
+    global _worker_mmap
+    _init_worker(mode, reordering_options)
+    _worker_bidi.order_paragraphs_ltr = True
+    _worker_mmap = _map_file(path)
+
+
+def _reorder_mapped_block(start, end, encoding, paraLevel, options):
+    return _reorder_block(_worker_bidi, memoryview(_worker_mmap)[start:end], encoding, paraLevel, options)
+
+
+def reorder_mapped_file(in_path, out_path, processes=1, paraLevel=UBiDiLevel.UBIDI_LTR, options=0,
+                        mode=UBiDiReorderingMode.UBIDI_REORDER_DEFAULT,
+                        reordering_options=UBiDiReorderingOption.UBIDI_OPTION_DEFAULT,
+                        encoding='utf-8', block_size=1 << 20):
+    """Reorder the paragraphs of the file *in_path* and write the result to *out_path*.
+
+    The input file is memory mapped and split into blocks of about
+    *block_size* bytes, which end after a paragraph separator (i.e. LF, CR,
+    CR LF or U+2029). A single paragraph is never split, therefore a
+    paragraph longer than *block_size* gets a larger block. Each block is reordered by a single call
+    of :meth:`Bidi.set_para` with :attr:`Bidi.order_paragraphs_ltr` set, the
+    result is written with a single write call. Therefore only a few blocks
+    are held in memory at any time.
+
+    If *encoding* is UTF-16 in native byte order, ICU reads the text
+    directly from the mapped file. Encodings with a byte order mark, i.e.
+    ``"utf-16"``, are not supported. Use ``"utf-16-le"`` or ``"utf-16-be"``.
+
+    If *processes* is greater than 1, the blocks are reordered by a pool of
+    worker processes. Each worker maps the input file itself, only the
+    block offsets and the results are transferred.
+    """
+    encoding = codecs.lookup(encoding).name
+    unit, separators = _separator_bytes(encoding)
+    options = int(options)
+    if os.path.exists(out_path) and os.path.samefile(in_path, out_path):
+        raise ValueError("Output file {} would overwrite the input file".format(out_path))
+    with io.open(out_path, 'wb') as dst:
+        if os.path.getsize(in_path) == 0:
+            # an empty file can't be mapped
+            return
+        mm = _map_file(in_path)
+        try:
+            if processes > 1:
+                _reorder_mapped_parallel(mm, dst, in_path, processes, paraLevel, options, mode, reordering_options,
+                                         encoding, unit, separators, block_size)
+                return
+            bidi = Bidi()
+            bidi.reordering_mode = mode
+            bidi.reordering_options = reordering_options
+            bidi.order_paragraphs_ltr = True
+            view = memoryview(mm)
+            try:
+                for start, end in _iter_blocks(mm, unit, separators, block_size):
+                    dst.write(_reorder_block(bidi, view[start:end], encoding, paraLevel, options))
+            finally:
+                # release all references to the mapped memory
+                bidi.close()
+                view.release()
+        finally:
+            mm.close()
+
+
+def _reorder_mapped_parallel(mm, dst, in_path, processes, paraLevel, options, mode, reordering_options,
+                             encoding, unit, separators, block_size):
+    max_pending = 2 * processes
+    pool = multiprocessing.Pool(processes, _init_mmap_worker, (in_path, mode, reordering_options))
+    try:
+        pending = collections.deque()
+        for start, end in _iter_blocks(mm, unit, separators, block_size):
+            pending.append(pool.apply_async(_reorder_mapped_block, (start, end, encoding, paraLevel, options)))
+            if len(pending) >= max_pending:
+                dst.write(pending.popleft().get())
+        while pending:
+            dst.write(pending.popleft().get())
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
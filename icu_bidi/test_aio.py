@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+
+from __future__ import absolute_import, print_function, division
+
+import asyncio
+import threading
+import unittest
+
+from icu_bidi import _impl as I
+from icu_bidi import aio
+from icu_bidi.test_impl import visual, logical_rtl
+
+OPTIONS = I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING
+
+
+class TestAsyncReorderer(unittest.TestCase):
+    def setUp(self):
+        self.original_reorder = aio._reorder
+
+    def tearDown(self):
+        aio._reorder = self.original_reorder
+
+    def testInline(self):
+        reorderer = aio.AsyncReorderer()
+        res = asyncio.run(reorderer.reorder(logical_rtl, I.UBiDiLevel.UBIDI_RTL, OPTIONS))
+        self.assertEqual(res, visual)
+        self.assertIsNone(reorderer._executor)
+
+    def testExecutor(self):
+        async def main(reorderer):
+            return await asyncio.gather(*[reorderer.reorder(logical_rtl, I.UBiDiLevel.UBIDI_RTL, OPTIONS)
+                                          for i in range(20)])
+
+        reorderer = aio.AsyncReorderer(max_workers=2, inline_threshold=0)
+        try:
+            self.assertListEqual(asyncio.run(main(reorderer)), [visual] * 20)
+            # a second event loop gets its own semaphore
+            self.assertListEqual(asyncio.run(main(reorderer)), [visual] * 20)
+            self.assertEqual(reorderer.max_pending, 4)
+        finally:
+            reorderer.shutdown()
+
+    def testAsyncWith(self):
+        release = threading.Event()
+
+        def blocking_reorder(text, *args):
+            release.wait(10)
+            return text
+
+        aio._reorder = blocking_reorder
+
+        async def main():
+            reorderer = aio.AsyncReorderer(max_workers=1, inline_threshold=0)
+            async with reorderer:
+                task = asyncio.ensure_future(reorderer.reorder(u"abc"))
+                await asyncio.sleep(0.01)
+                # runs only, if __aexit__ doesn't block the event loop
+                asyncio.get_running_loop().call_later(0.05, release.set)
+            self.assertTrue(release.is_set())
+            self.assertIsNone(reorderer._executor)
+            return await task
+
+        try:
+            self.assertEqual(asyncio.run(main()), u"abc")
+        finally:
+            release.set()
+
+    def testModuleReorder(self):
+        res = asyncio.run(aio.reorder(visual * 1000, I.UBiDiLevel.UBIDI_RTL, OPTIONS,
+                                      mode=I.UBiDiReorderingMode.UBIDI_REORDER_INVERSE_LIKE_DIRECT,
+                                      reordering_options=I.UBiDiReorderingOption.UBIDI_OPTION_INSERT_MARKS))
+        bidi = I.Bidi()
+        bidi.reordering_mode = I.UBiDiReorderingMode.UBIDI_REORDER_INVERSE_LIKE_DIRECT
+        bidi.reordering_options = I.UBiDiReorderingOption.UBIDI_OPTION_INSERT_MARKS
+        bidi.set_para(visual * 1000, I.UBiDiLevel.UBIDI_RTL)
+        self.assertEqual(res, bidi.get_reordered(OPTIONS))
+
+    def testBackPressure(self):
+        lock = threading.Lock()
+        active = [0, 0]  # current, maximum
+
+        def counting_reorder(*args):
+            with lock:
+                active[0] += 1
+                active[1] = max(active)
+            try:
+                return self.original_reorder(*args)
+            finally:
+                with lock:
+                    active[0] -= 1
+
+        aio._reorder = counting_reorder
+
+        async def main(reorderer):
+            return await asyncio.gather(*[reorderer.reorder(logical_rtl * 100) for i in range(30)])
+
+        reorderer = aio.AsyncReorderer(max_workers=4, max_pending=2, inline_threshold=0)
+        try:
+            res = asyncio.run(main(reorderer))
+        finally:
+            reorderer.shutdown()
+        self.assertEqual(res[0], self.original_reorder(logical_rtl * 100, I.UBiDiLevel.UBIDI_LTR, 0,
+                                                       I.UBiDiReorderingMode.UBIDI_REORDER_DEFAULT,
+                                                       I.UBiDiReorderingOption.UBIDI_OPTION_DEFAULT))
+        self.assertLessEqual(active[1], 2)
+
+    def testCancel(self):
+        started = threading.Event()
+        release = threading.Event()
+        texts = []
+
+        def blocking_reorder(text, *args):
+            texts.append(text)
+            started.set()
+            release.wait(10)
+            return text
+
+        aio._reorder = blocking_reorder
+
+        async def main(reorderer):
+            running = asyncio.ensure_future(reorderer.reorder(u"running"))
+            queued = asyncio.ensure_future(reorderer.reorder(u"queued"))
+            waiting = asyncio.ensure_future(reorderer.reorder(u"waiting"))
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, started.wait, 10)
+            await asyncio.sleep(0.01)
+            # "running" is being processed, "queued" is in the executor queue and
+            # "waiting" waits for a free slot
+            queued.cancel()
+            waiting.cancel()
+            running.cancel()
+            for task in (running, queued, waiting):
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+            # the running job still occupies its slot, the queued job doesn't
+            semaphore = reorderer._get_semaphore(loop)
+            await asyncio.wait_for(semaphore.acquire(), 1)
+            self.assertTrue(semaphore.locked())
+            semaphore.release()
+            release.set()
+            return await reorderer.reorder(u"next")
+
+        reorderer = aio.AsyncReorderer(max_workers=1, max_pending=2, inline_threshold=0)
+        try:
+            self.assertEqual(asyncio.run(main(reorderer)), u"next")
+        finally:
+            release.set()
+            reorderer.shutdown()
+        self.assertListEqual(texts, [u"running", u"next"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+from __future__ import absolute_import, print_function, division
+
+import json
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import icu
+
+from icu_bidi import bench
+from icu_bidi.bench import __main__ as bench_main
+
+
+class TestBench(unittest.TestCase):
+    def testRunSuite(self):
+        results = bench.run_suite(['tiny'], number=1, repeat=1)
+        self.assertEqual(sorted(r['operation'] for r in results), sorted(bench.OPERATIONS))
+        for r in results:
+            self.assertEqual(r['corpus'], 'tiny')
+            self.assertGreater(r['ops_per_sec'], 0)
+
+    def testImportTime(self):
+        import_icu, import_icu_bidi, first_call = bench.bench_import_time(repeat=1)
+        self.assertGreater(import_icu_bidi, 0)
+        self.assertGreater(first_call, 0)
+
+    def testJson(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'bench.json')
+        bench_main.main(['--json', path, '-c', 'rtl', '-o', 'set_para', '-n', '1', '-r', '1', '--no-comparisons'])
+        with open(path) as f:
+            data = json.load(f)
+        self.assertEqual(data['environment']['icu_version'], icu.ICU_VERSION)
+        self.assertEqual([(r['corpus'], r['operation']) for r in data['results']], [('rtl', 'set_para')])
+
+
+if __name__ == "__main__":
+    unittest.main()
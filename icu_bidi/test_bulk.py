@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+from __future__ import absolute_import, print_function, division
+
+import io
+import os.path
+import shutil
+import tempfile
+import unittest
+
+from icu_bidi import _impl as I
+from icu_bidi import bulk
+from icu_bidi import __main__ as cli
+from icu_bidi.test_impl import visual, logical_rtl
+
+
+class TestReorderFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def testReorderFiles(self):
+        in_dir = os.path.join(self.tmpdir, 'in')
+        out_dir = os.path.join(self.tmpdir, 'out')
+        os.mkdir(in_dir)
+        os.mkdir(out_dir)
+        lines = [logical_rtl + u'\n', u'abc\r\n', u'\n', logical_rtl]
+        paths = []
+        for i in range(2):
+            path = os.path.join(in_dir, 'f{}.txt'.format(i))
+            with io.open(path, 'w', encoding='utf-8', newline='') as f:
+                f.write(u''.join(lines * 7))
+            paths.append(path)
+        out_paths = bulk.reorder_files(paths, out_dir, 2, I.UBiDiLevel.UBIDI_RTL,
+                                       I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING, chunk_lines=3)
+        self.assertEqual(out_paths, [os.path.join(out_dir, 'f0.txt'), os.path.join(out_dir, 'f1.txt')])
+        expected = u''.join([visual + u'\n', u'abc\r\n', u'\n', visual] * 7)
+        for path in out_paths:
+            with io.open(path, encoding='utf-8', newline='') as f:
+                self.assertEqual(f.read(), expected)
+
+        self.assertRaises(ValueError, bulk.reorder_files, paths, in_dir, 1)
+
+
+class TestReorderMappedFile(unittest.TestCase):
+    lines = [logical_rtl + u'\n', u'abc\r\n', u'\n', logical_rtl + u' ' * 40 + u'\n', logical_rtl]
+    expected = u''.join([visual + u'\n', u'abc\r\n', u'\n', u' ' * 40 + visual + u'\n', visual])
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.in_path = os.path.join(self.tmpdir, 'in.txt')
+        self.out_path = os.path.join(self.tmpdir, 'out.txt')
+
+    def reorder(self, encoding, **kw):
+        with io.open(self.in_path, 'w', encoding=encoding, newline='') as f:
+            f.write(u''.join(self.lines * 5))
+        bulk.reorder_mapped_file(self.in_path, self.out_path, paraLevel=I.UBiDiLevel.UBIDI_RTL,
+                                 options=I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING, encoding=encoding, **kw)
+        with io.open(self.out_path, encoding=encoding, newline='') as f:
+            self.assertEqual(f.read(), self.expected * 5)
+
+    def testUtf8(self):
+        for block_size in (1, 50, 1 << 20):
+            self.reorder('utf-8', block_size=block_size)
+
+    def testUtf16(self):
+        for encoding in ('utf-16-le', 'utf-16-be'):
+            self.reorder(encoding, block_size=51)
+
+    def testProcesses(self):
+        self.reorder('utf-8', block_size=100, processes=2)
+
+    def testSeparators(self):
+        text = u''.join([logical_rtl + u'\r', u'abc\r\n', logical_rtl + u'\u2029', logical_rtl + u'\x1c'] * 5)
+        with io.open(self.in_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        with io.open(self.in_path, 'rb') as f:
+            data = f.read()
+        unit, separators = bulk._separator_bytes('utf-8')
+        blocks = list(bulk._iter_blocks(data, unit, separators, 20))
+        self.assertGreater(len(blocks), 5)
+        self.assertEqual(blocks[0][0], 0)
+        self.assertEqual(blocks[-1][1], len(data))
+        for (start, end), (next_start, _) in zip(blocks, blocks[1:]):
+            self.assertEqual(end, next_start)
+            self.assertTrue(data[:end].decode('utf-8')[-1] in u'\r\n\u2029\x1c')
+            self.assertFalse(data[end - 1:end + 1] == b'\r\n')
+        expected = u''.join([visual + u'\r', u'abc\r\n', visual + u'\u2029', visual + u'\x1c'] * 5)
+        for processes in (1, 2):
+            bulk.reorder_mapped_file(self.in_path, self.out_path, processes, I.UBiDiLevel.UBIDI_RTL,
+                                     I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING, block_size=20)
+            with io.open(self.out_path, encoding='utf-8', newline='') as f:
+                self.assertEqual(f.read(), expected)
+
+    def testErrors(self):
+        self.assertRaises(ValueError, self.reorder, 'utf-16')
+        self.assertRaises(ValueError, bulk.reorder_mapped_file, self.in_path, self.in_path)
+
+    def testEmpty(self):
+        io.open(self.in_path, 'wb').close()
+        bulk.reorder_mapped_file(self.in_path, self.out_path)
+        self.assertEqual(os.path.getsize(self.out_path), 0)
+
+    def testMain(self):
+        with io.open(self.in_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(logical_rtl + u'\n' + logical_rtl)
+        cli.main([self.in_path, self.out_path, '--level', 'rtl', '-w', 'do_mirroring', '--jobs', '2'])
+        with io.open(self.out_path, encoding='utf-8', newline='') as f:
+            self.assertEqual(f.read(), visual + u'\n' + visual)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+from __future__ import absolute_import, print_function, division
+
+import unittest
+
+import icu_bidi
+from icu_bidi import _impl as I
+from icu_bidi.test_impl import visual, logical_rtl, runs_rtl
+
+
+class TestCachedBidi(unittest.TestCase):
+    def testCache(self):
+        cache = icu_bidi.CachedBidi(maxsize=2, max_text_len=100)
+        mirroring = I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING
+        self.assertEqual(cache.reorder(logical_rtl, I.UBiDiLevel.UBIDI_RTL, mirroring), visual)
+        self.assertEqual(cache.reorder(logical_rtl, I.UBiDiLevel.UBIDI_RTL, mirroring), visual)
+        self.assertEqual(cache.cache_info(), (1, 1, 0, 2, 1))
+
+        # different options are different keys
+        self.assertNotEqual(cache.reorder(logical_rtl, I.UBiDiLevel.UBIDI_RTL), visual)
+        text, runs = cache.reorder_runs(visual, I.UBiDiLevel.UBIDI_RTL, mirroring,
+                                        I.UBiDiReorderingMode.UBIDI_REORDER_INVERSE_LIKE_DIRECT,
+                                        I.UBiDiReorderingOption.UBIDI_OPTION_INSERT_MARKS)
+        self.assertEqual(text, logical_rtl)
+        self.assertListEqual(list(runs), runs_rtl)
+        self.assertEqual(cache.cache_info(), (1, 3, 1, 2, 2))
+
+        # the least recently used entry got evicted
+        cache.reorder(logical_rtl, I.UBiDiLevel.UBIDI_RTL, mirroring)
+        self.assertEqual(cache.cache_info(), (1, 4, 2, 2, 2))
+
+        # long texts are not cached
+        cache.reorder(logical_rtl * 3)
+        cache.reorder(logical_rtl * 3)
+        self.assertEqual(cache.cache_info(), (1, 6, 2, 2, 2))
+
+        cache.cache_clear()
+        self.assertEqual(cache.cache_info(), (0, 0, 0, 2, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
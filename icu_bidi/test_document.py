@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+
+from __future__ import absolute_import, print_function, division
+
+import random
+import unittest
+
+import icu_bidi
+from icu_bidi import _impl as I
+from icu_bidi.test_impl import visual, logical_ltr, logical_rtl
+
+
+class TestBidiDocument(unittest.TestCase):
+    def assertSameResults(self, doc, expected):
+        self.assertEqual(doc.text, expected.text)
+        self.assertEqual(doc.length, expected.length)
+        self.assertListEqual(list(doc.iter_paragraphs()), list(expected.iter_paragraphs()))
+        self.assertEqual(doc.get_reordered(), expected.get_reordered())
+        self.assertEqual(doc.get_levels(), expected.get_levels())
+        self.assertEqual(doc.get_logical_map(), expected.get_logical_map())
+        self.assertEqual(doc.get_visual_map(), expected.get_visual_map())
+        self.assertListEqual(list(doc.get_visual_runs()), list(expected.get_visual_runs()))
+
+    def assertMatchesBidi(self, doc, paraLevel, options):
+        # compare with a single Bidi object for the whole text
+        text = doc.text
+        bidi = I.Bidi()
+        bidi.order_paragraphs_ltr = True
+        bidi.set_para(text, paraLevel)
+        n_paragraphs = bidi.count_paragraphs()
+        self.assertEqual(doc.length, bidi.length)
+        self.assertEqual(doc.get_text(), text)
+        self.assertListEqual(list(doc.iter_paragraphs(0, n_paragraphs)), list(bidi.iter_paragraphs()))
+        self.assertEqual(doc.get_reordered(), bidi.get_reordered(options))
+        self.assertEqual(doc.get_levels(), bytes(bytearray(bidi.get_levels())))
+        logical_map = bidi.get_logical_map()
+        visual_map = bidi.get_visual_map()
+        self.assertEqual(doc.get_logical_map(), logical_map)
+        self.assertEqual(doc.get_visual_map(), visual_map)
+        self.assertListEqual([doc.get_visual_index(i) for i in range(doc.length)], list(logical_map))
+        self.assertListEqual([doc.get_logical_index(i) for i in range(doc.visual_length)], list(visual_map))
+        # the runs cover the visual map
+        covered = []
+        for i in range(doc.count_runs()):
+            direction, start, length = doc.get_visual_run(i)
+            indexes = list(range(start, start + length))
+            covered.extend(reversed(indexes) if direction == I.UBiDiDirection.UBIDI_RTL else indexes)
+        self.assertListEqual(covered, list(visual_map))
+        self.assertListEqual([doc.get_visual_run(i) for i in range(doc.count_runs())], list(doc.get_visual_runs()))
+
+    def testParagraphs(self):
+        text = u"\n".join([logical_rtl, logical_ltr, u"", u"abc\r\ndef \u2029"])
+        options = I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING
+        doc = icu_bidi.BidiDocument(text, I.UBiDiLevel.UBIDI_DEFAULT_LTR, options)
+        bidi = I.Bidi()
+        bidi.order_paragraphs_ltr = True
+        bidi.set_para(text, I.UBiDiLevel.UBIDI_DEFAULT_LTR)
+        # the document has an empty last paragraph
+        self.assertEqual(doc.count_paragraphs(), bidi.count_paragraphs() + 1)
+        self.assertListEqual(list(doc.iter_paragraphs(0, bidi.count_paragraphs())), list(bidi.iter_paragraphs()))
+        self.assertEqual(doc.get_paragraph(len(text)), I.BidiParagraph(5, len(text), len(text), 0))
+        self.assertEqual(doc.get_reordered(), bidi.get_reordered(options))
+        self.assertEqual(doc.get_reordered(0, 1), visual + u"\n")
+        self.assertEqual(doc.get_levels(), bytes(bytearray(bidi.get_levels())))
+        self.assertEqual(doc.get_logical_map(), bidi.get_logical_map())
+        self.assertEqual(doc.get_visual_map(), bidi.get_visual_map())
+        self.assertEqual(doc.get_text(3, 7), text[3:7])
+
+    def testEdit(self):
+        doc = icu_bidi.BidiDocument(u"abc\n" + logical_ltr + u"\ndef", I.UBiDiLevel.UBIDI_RTL)
+        first = doc._paragraphs[0]
+        last = doc._paragraphs[2]
+        # an edit inside a paragraph analyses only this paragraph
+        self.assertEqual(doc.edit(4, 4, u"\u0643"), (1, 2))
+        self.assertIs(doc._paragraphs[0], first)
+        self.assertIs(doc._paragraphs[2], last)
+        self.assertSameResults(doc, icu_bidi.BidiDocument(doc.text, I.UBiDiLevel.UBIDI_RTL))
+        # insert and remove paragraph separators
+        self.assertEqual(doc.edit(1, 2, u"\r"), (0, 2))
+        self.assertEqual(doc.count_paragraphs(), 4)
+        self.assertSameResults(doc, icu_bidi.BidiDocument(doc.text, I.UBiDiLevel.UBIDI_RTL))
+        self.assertEqual(doc.edit(2, 2, u"\n"), (0, 2))
+        self.assertEqual(doc.text[:4], u"a\r\nc")
+        self.assertEqual(doc.count_paragraphs(), 4)
+        self.assertEqual(doc.edit(0, doc.length - 1, u""), (0, 1))
+        self.assertEqual(doc.text, u"f")
+        self.assertSameResults(doc, icu_bidi.BidiDocument(u"f", I.UBiDiLevel.UBIDI_RTL))
+        self.assertRaises(IndexError, doc.edit, 0, 2, u"")
+
+    def testRandomEdits(self):
+        alphabet = u"ab \u05d0\u05d1\u0627 12.(\n\r\U0001d400"
+        rnd = random.Random(4)
+        options = I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING
+        for paraLevel in (I.UBiDiLevel.UBIDI_LTR, I.UBiDiLevel.UBIDI_RTL, I.UBiDiLevel.UBIDI_DEFAULT_LTR):
+            for i in range(50):
+                text = u"".join(rnd.choice(alphabet) for j in range(rnd.randint(0, 30)))
+                doc = icu_bidi.BidiDocument(text, paraLevel, options)
+                for j in range(5):
+                    encoded = doc.text.encode('utf-16-le')
+                    while True:
+                        start = rnd.randint(0, doc.length)
+                        limit = rnd.randint(start, min(doc.length, start + 8))
+                        # don't split surrogate pairs
+                        if all(0 == k or k == doc.length or not 0xdc00 <= ord(encoded[2 * k:2 * k + 2].decode(
+                                'utf-16-le', 'surrogatepass')) <= 0xdfff for k in (start, limit)):
+                            break
+                    new_text = u"".join(rnd.choice(alphabet) for k in range(rnd.randint(0, 4)))
+                    doc.edit(start, limit, new_text)
+                    text = (encoded[:2 * start] + new_text.encode('utf-16-le') +
+                            encoded[2 * limit:]).decode('utf-16-le')
+                    self.assertEqual(doc.text, text)
+                    self.assertEqual(doc.get_text(start, start + len(new_text.encode('utf-16-le')) // 2), new_text)
+                    if paraLevel < I.UBiDiLevel.UBIDI_DEFAULT_LTR:
+                        self.assertMatchesBidi(doc, paraLevel, options)
+                    else:
+                        # With a default level ICU resolves numbers and brackets
+                        # using the strong characters of the previous paragraphs.
+                        self.assertSameResults(doc, icu_bidi.BidiDocument(text, paraLevel, options))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,7 +22,12 @@
 from __future__ import absolute_import, print_function, division
 
 from icu_bidi import _impl as I  # @IgnorePep8
+import array
 import ctypes
+import os
+import shutil
+import sys
+import tempfile
 import unittest
 import icu
 
@@ -67,8 +72,343 @@ class TestBidi(unittest.TestCase):
         self.assertEqual(length, r_sum)
         self.assertEqual(res, logical_rtl)
 
+    def testReorderMany(self):
+        options = I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING
+        texts = [logical_ltr, u"", u"abc", logical_ltr * 10, u"\U00010000 \u05d0\u05d1", logical_rtl]
+        bidi = I.Bidi()
+        expected = []
+        for text in texts:
+            bidi.set_para(text, I.UBiDiLevel.UBIDI_DEFAULT_LTR)
+            expected.append(bidi.get_reordered(options))
+        res = list(I.Bidi().reorder_many(texts, I.UBiDiLevel.UBIDI_DEFAULT_LTR, options))
+        self.assertListEqual(res, expected)
+        self.assertEqual(res[0], visual)
+
+    def testBufferReuse(self):
+        bidi = I.Bidi()
+        bidi.set_para(logical_ltr * 3)
+        bidi.get_reordered(0)
+        inbuf, outbuf = bidi._inbuf.buf, bidi._outbuf.buf
+        bidi.set_para(logical_rtl, I.UBiDiLevel.UBIDI_RTL)
+        self.assertEqual(bidi.get_reordered(I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING), visual)
+        self.assertIs(bidi._inbuf.buf, inbuf)
+        self.assertIs(bidi._outbuf.buf, outbuf)
+
+    def testLtrFastPath(self):
+        texts = [u"", u"abc", u"Latin 123 (x) 4.5", u"\U0001f600 ok\nnext line", u"a\u0301b"]
+        options = I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING | I.UBidiWriteReorderedOpt.UBIDI_REMOVE_BIDI_CONTROLS
+        fast = I.Bidi()
+        slow = I.Bidi(ltr_fast_path=False)
+        for text in texts:
+            for level in (I.UBiDiLevel.UBIDI_LTR, I.UBiDiLevel.UBIDI_DEFAULT_LTR):
+                fast.set_para(text, level)
+                slow.set_para(text, level)
+                self.assertEqual(fast._ltr_text, text)
+                self.assertIsNone(slow._ltr_text)
+                n_runs = slow.count_runs()
+                self.assertEqual(fast.count_runs(), n_runs)
+                self.assertEqual([fast.get_visual_run(i) for i in range(n_runs)],
+                                 [slow.get_visual_run(i) for i in range(n_runs)])
+                self.assertEqual(fast.length, slow.length)
+                self.assertEqual(fast.result_length, slow.result_length)
+                self.assertEqual(fast.get_reordered(options), slow.get_reordered(options))
+                self.assertEqual(fast.get_reordered(I.UBidiWriteReorderedOpt.UBIDI_OUTPUT_REVERSE),
+                                 slow.get_reordered(I.UBidiWriteReorderedOpt.UBIDI_OUTPUT_REVERSE))
+                self.assertIsNone(fast._ltr_text)
+        self.assertEqual(list(fast.reorder_many(texts, options=options)), texts)
+
+        fast.set_para(logical_ltr)
+        self.assertIsNone(fast._ltr_text)
+        fast.set_para(u"abc", I.UBiDiLevel.UBIDI_DEFAULT_RTL)
+        self.assertIsNone(fast._ltr_text)
+        fast.reordering_mode = I.UBiDiReorderingMode.UBIDI_REORDER_RUNS_ONLY
+        fast.set_para(u"abc")
+        self.assertIsNone(fast._ltr_text)
+        fast.reordering_mode = I.UBiDiReorderingMode.UBIDI_REORDER_DEFAULT
+        fast.set_para(u"abc")
+        self.assertEqual(fast._ltr_text, u"abc")
+
+        # the deferred ubidi_setPara uses the mode of the set_para call
+        fast.reordering_options = I.UBiDiReorderingOption.UBIDI_OPTION_INSERT_MARKS
+        self.assertEqual(fast.get_reordered(I.UBidiWriteReorderedOpt.UBIDI_OUTPUT_REVERSE), u"cba")
+        self.assertEqual(fast.reordering_options, I.UBiDiReorderingOption.UBIDI_OPTION_INSERT_MARKS)
+
+    def testLtrFastPathScreening(self):
+        import sys
+        import unicodedata
+        non_ltr = set(['R', 'AL', 'AN', 'LRE', 'LRO', 'RLE', 'RLO', 'PDF', 'LRI', 'RLI', 'FSI', 'PDI'])
+        for cp in range(sys.maxunicode + 1):
+            if 0xd800 <= cp < 0xe000:
+                continue
+            c = (b"\\U%08x" % cp).decode("unicode-escape")
+            if unicodedata.bidirectional(c) in non_ltr:
+                self.assertIsNotNone(I._non_ltr_search(c), hex(cp))
+
+    def testMaps(self):
+        for ltr_fast_path in (True, False):
+            bidi = I.Bidi(ltr_fast_path)
+            for text, level in ((logical_rtl, I.UBiDiLevel.UBIDI_RTL), (u"abc\U00010000", I.UBiDiLevel.UBIDI_LTR)):
+                bidi.set_para(text, level)
+                length = bidi.length
+                logical_map = bidi.get_logical_map()
+                visual_map = bidi.get_visual_map()
+                self.assertEqual(logical_map.itemsize, 4)
+                self.assertEqual(len(logical_map), length)
+                self.assertEqual(len(visual_map), length)
+                self.assertEqual(list(logical_map), [bidi.get_visual_index(i) for i in range(length)])
+                self.assertEqual(list(visual_map), [bidi.get_logical_index(i) for i in range(length)])
+                self.assertEqual(I.invert_map(logical_map), visual_map)
+                self.assertEqual(I.invert_map(list(visual_map)), logical_map)
+            bidi.set_para(u"", I.UBiDiLevel.UBIDI_RTL)
+            self.assertEqual(len(bidi.get_logical_map()), 0)
+            self.assertEqual(len(bidi.get_visual_map()), 0)
+        self.assertEqual(logical_map.tolist(), [0, 1, 2, 3, 4])
+        self.assertEqual(I.invert_map([]).tolist(), [])
+        self.assertEqual(I.invert_map([2, I.UBIDI_MAP_NOWHERE, 0]).tolist(), [2, -1, 0])
+
+    def testRuns(self):
+        for ltr_fast_path in (True, False):
+            bidi = I.Bidi(ltr_fast_path)
+            bidi.set_para(u"abc\U00010000")
+            self.assertListEqual(list(bidi.get_visual_runs()), [(0, 0, 5)])
+            self.assertListEqual(list(bidi.get_logical_runs()), [(0, 0, 5)])
+            self.assertListEqual(list(bidi.get_logical_runs().levels), [0])
+            bidi.set_para(u"")
+            self.assertEqual(len(bidi.get_visual_runs()), 0)
+            self.assertEqual(len(bidi.get_logical_runs()), 0)
+
+        bidi.reordering_mode = I.UBiDiReorderingMode.UBIDI_REORDER_INVERSE_LIKE_DIRECT
+        bidi.reordering_options = I.UBiDiReorderingOption.UBIDI_OPTION_INSERT_MARKS
+        bidi.set_para(visual, I.UBiDiLevel.UBIDI_RTL)
+        runs = bidi.get_visual_runs()
+        self.assertEqual(len(runs), len(runs_rtl))
+        self.assertListEqual(list(runs), runs_rtl)
+        self.assertEqual(runs[3], runs_rtl[3])
+        self.assertEqual(runs.lengths.tolist(), [r[2] for r in runs_rtl])
+
+        logical_runs = bidi.get_logical_runs()
+        self.assertListEqual(sorted(logical_runs, key=lambda r: r[1]), sorted(runs_rtl, key=lambda r: r[1]))
+        self.assertListEqual([level & 1 for level in logical_runs.levels], list(logical_runs.directions))
+
+    def testLevels(self):
+        bidi = I.Bidi()
+        bidi.set_para(logical_rtl, I.UBiDiLevel.UBIDI_RTL)
+        levels = bidi.get_levels()
+        self.assertEqual(len(levels), len(logical_rtl))
+        self.assertEqual(levels[0], 1)
+        runs = bidi.get_logical_runs()
+        expected = bytearray()
+        for level, length in zip(runs.levels, runs.lengths):
+            expected.extend([level] * length)
+        self.assertEqual(levels.tobytes(), bytes(expected))
+
+        bidi.set_para(u"abc")
+        self.assertEqual(bytes(bidi.get_levels()), b"\0\0\0")
+        bidi.set_para(u"", I.UBiDiLevel.UBIDI_RTL)
+        self.assertEqual(len(bidi.get_levels()), 0)
+
+        text = u"abc def"
+        rtl = 1 | I.UBiDiLevel.UBIDI_LEVEL_OVERRIDE
+        for embedding in (bytearray([0, 0, 0, 0, rtl, rtl, rtl]), bytes(bytearray([0, 0, 0, 0, rtl, rtl, rtl])),
+                          memoryview(bytearray([0, 0, 0, 0, rtl, rtl, rtl, 0]))):
+            bidi.set_para(text, I.UBiDiLevel.UBIDI_LTR, embedding)
+            self.assertEqual(bidi.get_reordered(0), u"abc fed")
+            self.assertEqual(bytes(bidi.get_levels()), b"\0\0\0\0\1\1\1")
+        self.assertRaises(ValueError, bidi.set_para, text, I.UBiDiLevel.UBIDI_LTR, bytearray(3))
+
+    @unittest.skipUnless(hasattr(memoryview, 'release'), "requires Python 3")
+    def testLevelsReleased(self):
+        bidi = I.Bidi()
+        for invalidate in (lambda: bidi.set_para(u"abc"), bidi.release_buffers, bidi.close):
+            bidi.set_para(logical_rtl, I.UBiDiLevel.UBIDI_RTL)
+            levels = bidi.get_levels()
+            line_levels = bidi.set_line(0, 10).get_levels()
+            self.assertEqual(levels[0], 1)
+            invalidate()
+            # the memory of ICU is gone, reading it raises an exception
+            with self.assertRaises(ValueError):
+                levels[0]
+            with self.assertRaises(ValueError):
+                line_levels[0]
+        self.assertTrue(bidi.closed)
+
+    def testLines(self):
+        bidi = I.Bidi()
+        bidi.set_para(logical_rtl, I.UBiDiLevel.UBIDI_RTL)
+        lines = bidi.lines([10, 25])
+        self.assertEqual([(line.start, line.limit) for line in lines], [(0, 10), (10, 25), (25, len(logical_rtl))])
+        for line in lines:
+            self.assertEqual(line.length, line.limit - line.start)
+            self.assertEqual(line.get_levels().tobytes(), bidi.get_levels()[line.start:line.limit].tobytes())
+            self.assertEqual(sum(r[2] for r in line.get_visual_runs()), line.length)
+            self.assertEqual(line.get_visual_map(), I.invert_map(line.get_logical_map()))
+        reordered = [u"Mor 123 \u0643\u062a", u"5 \u062a\u0643\u0631\u0634< e latin", u"Latin1 \u060c)\u0643 67"]
+        self.assertEqual([line.get_reordered(0) for line in lines], reordered)
+        self.assertEqual(bidi.set_line(0, len(logical_rtl)).get_reordered(0), bidi.get_reordered(0))
+
+        # a single line object for all lines
+        self.assertEqual([(line.start, line.limit, line.get_reordered(0))
+                          for line in bidi.iter_lines_reusing([10, 25])],
+                         [(0, 10, reordered[0]), (10, 25, reordered[1]), (25, len(logical_rtl), reordered[2])])
+        self.assertEqual(len(set(id(line) for line in bidi.iter_lines_reusing([10, 25]))), 1)
+        line = bidi.set_line(0, 10)
+        line.reset(25, len(logical_rtl))
+        self.assertEqual(line.get_text(), logical_rtl[25:])
+        self.assertEqual(line.get_reordered(0), reordered[2])
+
+        bidi.set_para(u"abc")
+        self.assertEqual([line.get_reordered(0) for line in bidi.lines([1])], [u"a", u"bc"])
+        bidi.set_para(u"")
+        self.assertEqual(bidi.lines([]), [])
+        self.assertEqual(list(bidi.iter_lines_reusing([])), [])
+
+    def testParagraphs(self):
+        text = u"abc\n" + logical_rtl + u"\r\n\n\u05d0 abc"
+        bidi = I.Bidi()
+        bidi.set_para(text, I.UBiDiLevel.UBIDI_DEFAULT_LTR)
+        self.assertEqual(bidi.count_paragraphs(), 4)
+        paragraphs = list(bidi.iter_paragraphs())
+        n = len(logical_rtl)
+        self.assertListEqual(paragraphs, [(0, 0, 4, 0), (1, 4, n + 6, 1), (2, n + 6, n + 7, 0), (3, n + 7, n + 12, 1)])
+        self.assertListEqual([p.direction for p in paragraphs],
+                             [I.UBiDiDirection.UBIDI_LTR, I.UBiDiDirection.UBIDI_RTL,
+                              I.UBiDiDirection.UBIDI_LTR, I.UBiDiDirection.UBIDI_RTL])
+        self.assertEqual(bidi.get_paragraph(5), paragraphs[1])
+        self.assertEqual(bidi.get_paragraph_by_index(3), paragraphs[3])
+        self.assertEqual(bidi.para_level, 0)
+        para = paragraphs[1]
+        self.assertEqual(bidi.get_text(para.start, para.limit), logical_rtl + u"\r\n")
+        self.assertEqual(bidi.set_line(para.start, para.limit - 2).get_reordered(
+            I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING), visual)
+
+        bidi.set_para(u"abc\ndef")
+        self.assertListEqual(list(bidi.iter_paragraphs()), [(0, 0, 4, 0), (1, 4, 7, 0)])
+
+    def testDirection(self):
+        texts = [u"", u"123 ", u"abc \u05d0", u"(\u05d0 abc", u"\U00010800", logical_ltr]
+        expected = [I.UBiDiDirection.UBIDI_NEUTRAL, I.UBiDiDirection.UBIDI_NEUTRAL, I.UBiDiDirection.UBIDI_LTR,
+                    I.UBiDiDirection.UBIDI_RTL, I.UBiDiDirection.UBIDI_RTL, I.UBiDiDirection.UBIDI_LTR]
+        self.assertListEqual([I.base_direction(text) for text in texts], expected)
+        self.assertIs(I.base_direction(u"abc"), I.UBiDiDirection.UBIDI_LTR)
+        directions = I.base_directions(iter(texts))
+        self.assertEqual(directions.typecode, 'b')
+        self.assertListEqual(list(directions), expected)
+
+        bidi = I.Bidi()
+        for text, direction in ((u"abc", I.UBiDiDirection.UBIDI_LTR), (logical_ltr, I.UBiDiDirection.UBIDI_MIXED),
+                                (u"\u05d0\u05d1", I.UBiDiDirection.UBIDI_RTL)):
+            bidi.set_para(text, I.UBiDiLevel.UBIDI_DEFAULT_LTR)
+            self.assertIs(bidi.direction, direction)
+
+    def testClose(self):
+        n_objects = len(I.Bidi._all_bidi_objects)
+        with I.Bidi() as bidi:
+            self.assertEqual(len(I.Bidi._all_bidi_objects), n_objects + 1)
+            self.assertFalse(bidi.closed)
+            bidi.set_para(logical_rtl, I.UBiDiLevel.UBIDI_RTL)
+            self.assertEqual(bidi.get_reordered(I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING), visual)
+            bidi.release_buffers()
+            self.assertEqual(bidi._inbuf.capacity, 0)
+            self.assertEqual(bidi.length, 0)
+            self.assertEqual(bidi.get_reordered(0), u"")
+        self.assertTrue(bidi.closed)
+        self.assertEqual(len(I.Bidi._all_bidi_objects), n_objects)
+        self.assertRaises(icu.ICUError, bidi.set_para, u"abc")
+        bidi.close()
+        bidi.release_buffers()
+
+    def testSetParaUtf16(self):
+        encoded = logical_rtl.encode(I.UCHAR_ENCODING)
+        bidi = I.Bidi()
+        for buffer in (encoded, bytearray(encoded), memoryview(encoded), array.array('H', [ord(c) for c in logical_rtl]),
+                       icu.UnicodeString(logical_rtl)):
+            bidi.set_para_utf16(buffer, I.UBiDiLevel.UBIDI_RTL)
+            self.assertEqual(bidi.get_text(), logical_rtl)
+            self.assertEqual(bidi.get_reordered(I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING), visual)
+            self.assertEqual(bidi.get_reordered_utf16(I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING),
+                             visual.encode(I.UCHAR_ENCODING))
+        with self.assertRaises(ValueError):
+            bidi.set_para_utf16(encoded[:-1])
+        # the text of set_para replaces the external buffer
+        bidi.set_para(logical_ltr, I.UBiDiLevel.UBIDI_LTR)
+        self.assertEqual(bidi.get_text(), logical_ltr)
+        self.assertEqual(bidi.get_reordered_utf16(0), bidi.get_reordered(0).encode(I.UCHAR_ENCODING))
+        bidi.set_para(u"ltr only")
+        self.assertEqual(bidi.get_reordered_utf16(0), u"ltr only".encode(I.UCHAR_ENCODING))
+
+    def testSetParaUtf16ZeroCopy(self):
+        buffer = bytearray(logical_rtl.encode(I.UCHAR_ENCODING))
+        bidi = I.Bidi()
+        bidi.set_para_utf16(buffer, I.UBiDiLevel.UBIDI_RTL)
+        self.assertEqual(ctypes.cast(bidi._textbuf.buf, ctypes.c_void_p).value,
+                         ctypes.addressof(ctypes.c_char.from_buffer(buffer)))
+
+    def testErrorReset(self):
+        bidi = I.Bidi()
+        bidi.set_para(logical_rtl, I.UBiDiLevel.UBIDI_RTL)
+        with self.assertRaises(icu.ICUError):
+            bidi.get_visual_index(len(logical_rtl) + 10)
+        # the failure does not affect the next call
+        self.assertEqual(bidi.get_visual_index(0), len(logical_rtl) - 1)
+        with self.assertRaises(icu.ICUError):
+            bidi.set_line(5, 2)
+        self.assertEqual(bidi.get_reordered(I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING), visual)
+
+    def testOpenSized(self):
+        bidi = I.Bidi(max_length=len(logical_rtl), max_run_count=20)
+        bidi.set_para(logical_rtl, I.UBiDiLevel.UBIDI_RTL)
+        self.assertEqual(bidi.get_reordered(I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING), visual)
+        with self.assertRaises(MemoryError) as cm:
+            bidi.set_para(logical_rtl * 2, I.UBiDiLevel.UBIDI_RTL)
+        self.assertIsInstance(cm.exception, icu.ICUError)
+        self.assertIsInstance(cm.exception, I.IcuMemoryError)
+        self.assertEqual(cm.exception.args[0], I.IcuErrChecker.U_MEMORY_ALLOCATION_ERROR)
+
+        # trivial LTR text, that would take the fast path
+        bidi = I.Bidi(max_length=5)
+        bidi.set_para(u"hello")
+        self.assertEqual(bidi.get_reordered(0), u"hello")
+        self.assertRaises(I.IcuMemoryError, bidi.set_para, u"hello world")
+        self.assertRaises(I.IcuMemoryError, bidi.set_para, u"abcd\U00010000")
+
+    def testIterReordered(self):
+        import io
+        text = u"\n".join([logical_ltr, u"\U00010000\u05d0 \U00010001", u"", logical_rtl] * 5)
+        bidi = I.Bidi()
+        bidi.order_paragraphs_ltr = True
+        bidi.set_para(text, I.UBiDiLevel.UBIDI_DEFAULT_LTR)
+        expected = bidi.get_reordered(0)
+        bidi = I.Bidi()
+        for source in (io.StringIO(text), [text[:20], text[20:]]):
+            parts = list(bidi.iter_reordered(source, I.UBiDiLevel.UBIDI_DEFAULT_LTR, chunk_size=30))
+            self.assertGreater(len(parts), 1)
+            self.assertEqual(u"".join(parts), expected)
+        self.assertFalse(bidi.order_paragraphs_ltr)
+        self.assertEqual(bidi.reordering_options, I.UBiDiReorderingOption.UBIDI_OPTION_DEFAULT)
+
 
 class TestBinding(unittest.TestCase):
+    def testUnchecked(self):
+        self.assertIsNot(I._ubidi_setPara, I.ubidi_setPara)
+        self.assertIs(I.ubidi_setPara.errcheck.__func__, I.IcuErrChecker.errcheck.__func__)
+        self.assertEqual(I._ubidi_setPara.argtypes, I.ubidi_setPara.argtypes)
+
+    def testLazyFunction(self):
+        namespace = {}
+        generator = I.IcuBindingGenerator(icu.ICU_VERSION, namespace)
+        lazy = namespace['getLength'] = generator.function('ubidi_getLength', ctypes.c_int32, I._pBiDi)
+        self.assertIsInstance(lazy, I.LazyFunction)
+        self.assertIsNone(generator._lib)
+        bidi = I.Bidi(ltr_fast_path=False)
+        bidi.set_para(logical_rtl)
+        self.assertEqual(lazy(bidi.pbidi), len(logical_rtl))
+        # the first call replaced the placeholder
+        func = namespace['getLength']
+        self.assertNotIsInstance(func, I.LazyFunction)
+        self.assertIs(func, lazy.func)
+        self.assertEqual(func(bidi.pbidi), len(logical_rtl))
+        self.assertIn(func, generator.functions)
+
     def testInverseBidi(self):
         pBiDi = I.ubidi_open()
         self.addCleanup(I.ubidi_close, pBiDi)
@@ -120,6 +460,58 @@ class TestBinding(unittest.TestCase):
         self.assertRaises(icu.ICUError, I.ubidi_writeReordered, pBiDi, None, -1, 0, I.IcuErrChecker.DEFAULT_CHECKER)
 
 
+class TestLibraryLoading(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        environ = dict(os.environ)
+        self.addCleanup(os.environ.update, environ)
+        self.addCleanup(os.environ.clear)
+        os.environ['XDG_CACHE_HOME'] = self.tmpdir
+        os.environ.pop(I.IcuBindingGenerator.LIBRARY_ENV, None)
+        self.libname = I._bg.lib._name
+
+    def generator(self):
+        return I.IcuBindingGenerator(icu.ICU_VERSION)
+
+    def testEnvironment(self):
+        os.environ[I.IcuBindingGenerator.LIBRARY_ENV] = self.libname
+        generator = self.generator()
+        self.assertEqual(generator.lib._name, self.libname)
+        self.assertFalse(os.path.exists(generator.cache_file()))
+        os.environ[I.IcuBindingGenerator.LIBRARY_ENV] = os.path.join(self.tmpdir, 'no-such-library.so')
+        with self.assertRaises(EnvironmentError):
+            self.generator().lib
+
+    def testCacheFile(self):
+        generator = self.generator()
+        cache_file = generator.cache_file()
+        self.assertTrue(cache_file.startswith(self.tmpdir))
+        generator.lib
+        with open(cache_file) as f:
+            self.assertEqual(f.read(), self.libname)
+        self.assertEqual(self.generator().lib._name, self.libname)
+
+        # a stale cache file gets replaced
+        with open(cache_file, 'w') as f:
+            f.write(os.path.join(self.tmpdir, 'no-such-library.so'))
+        self.assertEqual(self.generator().lib._name, self.libname)
+        with open(cache_file) as f:
+            self.assertEqual(f.read(), self.libname)
+
+        # an unreadable cache file is ignored
+        os.remove(cache_file)
+        os.mkdir(cache_file)
+        self.assertEqual(self.generator().lib._name, self.libname)
+
+    def testCacheKey(self):
+        cache_file = self.generator().cache_file()
+        prefix = sys.prefix
+        self.addCleanup(setattr, sys, 'prefix', prefix)
+        sys.prefix = os.path.join(prefix, 'other-env')
+        self.assertNotEqual(self.generator().cache_file(), cache_file)
+
+
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+from __future__ import absolute_import, print_function, division
+
+import unittest
+
+import icu_bidi
+from icu_bidi.test_impl import logical_rtl
+
+
+class TestLayoutParagraph(unittest.TestCase):
+    def testLatin(self):
+        self.assertListEqual(icu_bidi.layout_paragraph(u"aaa bbb ccc dddddddddddddddd e", 7),
+                             [u"aaa bbb", u"ccc", u"dddddddddddddddd", u"e"])
+        self.assertListEqual(icu_bidi.layout_paragraph(u"aaa\n\nbbb \U00010000 c\n", 80),
+                             [u"aaa", u"", u"bbb \U00010000 c"])
+        self.assertListEqual(icu_bidi.layout_paragraph(u"", 80), [])
+
+    def testParagraphSeparators(self):
+        # U+001C is no line break opportunity, but ends a bidi paragraph
+        self.assertListEqual(icu_bidi.layout_paragraph(u"ab cd\x1cef\x85g\u2029", 80),
+                             [u"ab cd", u"ef", u"g"])
+
+    def testMeasure(self):
+        self.assertListEqual(icu_bidi.layout_paragraph(u"aa bb cc", 2, measure=lambda s: len(s.split())),
+                             [u"aa bb", u"cc"])
+        segments = []
+        icu_bidi.layout_paragraph(u"aa bb cc dd", 5, measure=lambda s: segments.append(s) or len(s))
+        # the segments are measured separately, not the growing line
+        self.assertTrue(segments)
+        self.assertLessEqual(len(segments), 8)
+        self.assertTrue(all(len(s.split()) <= 1 for s in segments))
+
+    def testRtl(self):
+        lines = icu_bidi.layout_paragraph(logical_rtl + u"\n\nab  cd", 15)
+        self.assertListEqual(lines, [u"More 123 \u0643\u062a", u"567 \u062a\u0643\u0631\u0634< latin",
+                                     u"Latin1 \u060c)\u0643", u"", u"ab  cd"])
+
+
+if __name__ == "__main__":
+    unittest.main()
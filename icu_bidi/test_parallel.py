@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+from __future__ import absolute_import, print_function, division
+
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+import icu_bidi
+from icu_bidi import _impl as I
+from icu_bidi.test_impl import visual, logical_ltr, logical_rtl
+
+
+class TestReorderParallel(unittest.TestCase):
+    def testOrder(self):
+        texts = [logical_rtl, u"abc", logical_ltr * 3, u""] * 100
+        bidi = I.Bidi()
+        options = I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING
+        expected = list(bidi.reorder_many(texts, I.UBiDiLevel.UBIDI_RTL, options))
+        res = icu_bidi.reorder_parallel(iter(texts), 3, I.UBiDiLevel.UBIDI_RTL, options, chunk_size=7)
+        self.assertListEqual(res, expected)
+        self.assertEqual(res[0], visual)
+
+        with ThreadPoolExecutor(2) as executor:
+            res = icu_bidi.reorder_parallel(texts, paraLevel=I.UBiDiLevel.UBIDI_RTL, options=options,
+                                            executor=executor)
+        self.assertListEqual(res, expected)
+
+    def testMode(self):
+        res = icu_bidi.reorder_parallel([visual] * 10, 2, I.UBiDiLevel.UBIDI_RTL,
+                                        I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING |
+                                        I.UBidiWriteReorderedOpt.UBIDI_KEEP_BASE_COMBINING,
+                                        mode=I.UBiDiReorderingMode.UBIDI_REORDER_INVERSE_LIKE_DIRECT,
+                                        reordering_options=I.UBiDiReorderingOption.UBIDI_OPTION_INSERT_MARKS)
+        self.assertListEqual(res, [logical_rtl] * 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+from __future__ import absolute_import, print_function, division
+
+import threading
+import unittest
+
+import icu_bidi
+from icu_bidi import _impl as I
+from icu_bidi.test_impl import visual, logical_rtl
+
+
+class TestBidiPool(unittest.TestCase):
+    def testAcquire(self):
+        pool = icu_bidi.BidiPool(maxsize=2, prefill=1)
+        self.assertEqual(pool.idle, 1)
+        with pool.acquire(mode=I.UBiDiReorderingMode.UBIDI_REORDER_INVERSE_LIKE_DIRECT,
+                          options=I.UBiDiReorderingOption.UBIDI_OPTION_INSERT_MARKS) as bidi:
+            self.assertEqual(bidi.reordering_mode, I.UBiDiReorderingMode.UBIDI_REORDER_INVERSE_LIKE_DIRECT)
+            self.assertEqual(bidi.reordering_options, I.UBiDiReorderingOption.UBIDI_OPTION_INSERT_MARKS)
+            with pool.acquire() as bidi2:
+                self.assertIsNot(bidi2, bidi)
+                with pool.acquire() as bidi3:
+                    pass
+        self.assertEqual((pool.hits, pool.misses), (1, 2))
+        self.assertEqual(pool.idle, 2)
+
+        with pool.acquire() as bidi4:
+            self.assertIn(bidi4, (bidi, bidi2, bidi3))
+            self.assertEqual(bidi4.reordering_mode, I.UBiDiReorderingMode.UBIDI_REORDER_DEFAULT)
+            self.assertEqual(bidi4.reordering_options, I.UBiDiReorderingOption.UBIDI_OPTION_DEFAULT)
+        self.assertEqual((pool.hits, pool.misses), (2, 2))
+        # the pool was full, when the third object got returned
+        self.assertEqual([b.closed for b in (bidi, bidi2, bidi3)].count(True), 1)
+
+        pool.close()
+        self.assertEqual(pool.idle, 0)
+        self.assertTrue(bidi4.closed)
+
+    def testPutClosed(self):
+        pool = icu_bidi.BidiPool(maxsize=2)
+        with pool.acquire() as bidi:
+            bidi.close()
+        self.assertEqual(pool.idle, 0)
+        with pool.acquire() as bidi2:
+            self.assertIsNot(bidi2, bidi)
+            self.assertFalse(bidi2.closed)
+        self.assertEqual(pool.idle, 1)
+
+    def testReset(self):
+        pool = icu_bidi.BidiPool(maxsize=1, max_buffer_size=100)
+        with pool.acquire() as bidi:
+            bidi.inverse = True
+            bidi.order_paragraphs_ltr = True
+            bidi.ltr_fast_path = False
+            bidi.set_para(logical_rtl * 10, I.UBiDiLevel.UBIDI_RTL)
+            bidi.get_reordered(0)
+        self.assertFalse(bidi.inverse)
+        self.assertFalse(bidi.order_paragraphs_ltr)
+        self.assertTrue(bidi.ltr_fast_path)
+        self.assertEqual(bidi.reordering_mode, I.UBiDiReorderingMode.UBIDI_REORDER_DEFAULT)
+        # the large paragraph has been released
+        self.assertLessEqual(bidi._inbuf.capacity, 100)
+        self.assertLessEqual(bidi._outbuf.capacity, 100)
+        self.assertEqual(bidi.length, 0)
+
+        # a large LTR paragraph and a buffer of the caller
+        for text in (u"abc" * 100, logical_rtl):
+            with pool.acquire() as bidi2:
+                self.assertIs(bidi2, bidi)
+                if text is logical_rtl:
+                    bidi.set_para_utf16(bytearray(text.encode(I.UCHAR_ENCODING)), I.UBiDiLevel.UBIDI_RTL)
+                else:
+                    bidi.set_para(text)
+            self.assertIsNone(bidi._ltr_text)
+            self.assertIs(bidi._textbuf, bidi._inbuf)
+            self.assertEqual(bidi.length, 0)
+
+        # small paragraphs are kept
+        with pool.acquire() as bidi:
+            bidi.set_para(logical_rtl, I.UBiDiLevel.UBIDI_RTL)
+        self.assertEqual(bidi.length, len(logical_rtl))
+
+    def testThreads(self):
+        pool = icu_bidi.BidiPool(maxsize=4)
+        results = []
+
+        def run():
+            for _ in range(50):
+                with pool.acquire() as bidi:
+                    bidi.set_para(logical_rtl, I.UBiDiLevel.UBIDI_RTL)
+                    results.append(bidi.get_reordered(I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING))
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, [visual] * 200)
+        self.assertEqual(pool.hits + pool.misses, 200)
+        self.assertLessEqual(pool.idle, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2014 by science+computing ag
+# Author: Anselm Kruis <a.kruis@science-computing.de>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+
+from __future__ import absolute_import, print_function, division
+
+import ctypes
+import unittest
+
+import icu_bidi
+from icu_bidi import _impl as I
+from icu_bidi.test_impl import visual, logical_rtl
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        icu_bidi.reset_stats()
+        self.addCleanup(icu_bidi.reset_stats)
+        self.addCleanup(icu_bidi.disable_stats)
+
+    def testDisabled(self):
+        set_para = I.Bidi.set_para
+        ubidi_setPara = I._ubidi_setPara
+        icu_bidi.enable_stats()
+        self.assertTrue(icu_bidi.stats_enabled())
+        self.assertIsNot(I._ubidi_setPara, ubidi_setPara)
+        icu_bidi.disable_stats()
+        self.assertFalse(icu_bidi.stats_enabled())
+        # the original functions are back in place
+        self.assertIs(I.Bidi.set_para, set_para)
+        self.assertIs(I._ubidi_setPara, ubidi_setPara)
+        I.Bidi().set_para(logical_rtl, I.UBiDiLevel.UBIDI_RTL)
+        self.assertEqual(icu_bidi.stats(), {})
+
+    def testStats(self):
+        calls = []
+
+        def hook(name, elapsed, size):
+            calls.append((name, size))
+        icu_bidi.add_stats_hook(hook)
+        self.addCleanup(icu_bidi.remove_stats_hook, hook)
+        icu_bidi.enable_stats()
+        bidi = I.Bidi()
+        for i in range(3):
+            bidi.set_para(logical_rtl, I.UBiDiLevel.UBIDI_RTL)
+            self.assertEqual(bidi.get_reordered(I.UBidiWriteReorderedOpt.UBIDI_DO_MIRRORING), visual)
+        stats = icu_bidi.stats()
+        self.assertEqual(stats['ubidi_setPara'].calls, 3)
+        self.assertEqual(stats['ubidi_writeReordered'].calls, 3)
+        self.assertEqual(stats['Bidi.set_para'].calls, 3)
+        self.assertGreater(stats['Bidi.set_para'].time, stats['ubidi_setPara'].time)
+        self.assertEqual(stats['UCharBuffer.store'].bytes, 3 * 2 * len(logical_rtl))
+        self.assertEqual(stats['UCharBuffer.store'].max_bytes, 2 * len(logical_rtl))
+        # two empty buffers in Bidi.__init__, then each buffer grows once
+        self.assertEqual(stats['ucharbuf_alloc'].calls, 4)
+        self.assertEqual(stats['ucharbuf_alloc'].max_bytes, 2 * len(logical_rtl))
+        self.assertIn(('ubidi_setPara', None), calls)
+        self.assertIn(('UCharBuffer.get_text', 2 * len(visual)), calls)
+
+        icu_bidi.reset_stats()
+        self.assertEqual(icu_bidi.stats(), {})
+
+    def removeBinding(self, lazy):
+        # restore the list of bindings of the module
+        for func in (lazy, lazy.func):
+            if func in I._bg.functions:
+                I._bg.functions.remove(func)
+
+    def testLazyFunction(self):
+        # stats of a function, that hasn't been bound yet
+        lazy = I._bg.function('ubidi_getLength', ctypes.c_int32, I._pBiDi)
+        self.addCleanup(self.removeBinding, lazy)
+        self.addCleanup(setattr, I, 'ubidi_getLength', I.ubidi_getLength)
+        I.ubidi_getLength = lazy
+        icu_bidi.enable_stats()
+        self.assertIsNotNone(lazy.func)
+        bidi = I.Bidi()
+        bidi.set_para(logical_rtl, I.UBiDiLevel.UBIDI_RTL)
+        self.assertEqual(bidi.length, len(logical_rtl))
+        self.assertEqual(icu_bidi.stats()['ubidi_getLength'].calls, 1)
+        icu_bidi.disable_stats()
+        self.assertIs(I.ubidi_getLength, lazy)
+        self.assertEqual(bidi.length, len(logical_rtl))
+        self.assertIs(I.ubidi_getLength, lazy.func)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -32,6 +32,7 @@ for line in open('conf.py'):
 requires = ['PyICU>=1.4']
 if sys.hexversion < 0x03000000:
     requires.append('enum34')
+    requires.append('futures')
 
 setup(
     name='PyICU_BiDi',
@@ -40,7 +41,10 @@ setup(
     author='Anselm Kruis',
     author_email='a.kruis@science-computing.de',
     url='http://pypi.python.org/pypi/PyICU_BiDi',
-    packages=['icu_bidi'],
+    packages=['icu_bidi', 'icu_bidi.bench'],
+    entry_points={
+        'console_scripts': ['icu-bidi = icu_bidi.__main__:main'],
+    },
 
     # don't forget to add these files to MANIFEST.in too
     #package_data={'pyheapdump': ['examples/*.py']},